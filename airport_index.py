@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Airport Index
+=============
+
+Loads the airport table once into hash-indexed structures shared by the API
+(backend/main.py) and the command line tool (use_model.py).
+
+create_model.py writes the table twice: models/airports.csv for people and
+other tools, and models/airports.bin, a compact binary index that loads with
+the standard library alone. The binary layout (little-endian) is:
+
+    magic b'FDAI', uint16 version, uint32 airport count n
+    n int32 airport IDs, ascending
+    3n uint16 byte lengths of the strings (name, city, state per airport)
+    UTF-8 strings, back to back
+"""
+
+import csv
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+AIRPORTS_CSV = 'airports.csv'
+AIRPORTS_BINARY = 'airports.bin'
+
+BINARY_MAGIC = b'FDAI'
+BINARY_VERSION = 1
+_HEADER = struct.Struct('<4sHI')
+
+
+class AirportIndex:
+    """
+    Airport records indexed for O(1) validation and lookup.
+
+    Each record is a dict with the airports.csv columns
+    (AirportID, AirportName, City, State), with AirportID as an int.
+    """
+
+    def __init__(self, records):
+        # Keep the file order (sorted by ID) for lookups and listings
+        self.by_id = {record['AirportID']: record for record in records}
+        self.ids = frozenset(self.by_id)
+
+        # Sorted by name for consistent ordering in the API
+        self.sorted_by_name = sorted(self.by_id.values(), key=lambda r: r['AirportName'])
+        self.ids_by_name = [record['AirportID'] for record in self.sorted_by_name]
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self, airport_id):
+        return airport_id in self.ids
+
+    def get(self, airport_id):
+        """Return the record for an airport ID, or None if it is unknown."""
+        return self.by_id.get(airport_id)
+
+
+def airport_index_path(models_dir):
+    """The binary airport index in models_dir, or airports.csv for models trained before it existed."""
+    path = os.path.join(models_dir, AIRPORTS_BINARY)
+    return path if os.path.exists(path) else os.path.join(models_dir, AIRPORTS_CSV)
+
+
+def _little_endian(values):
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def _text(value):
+    """Airport field as text; blanks (None or NaN) become '' and other values their str()."""
+    if value is None or value != value:
+        return ''
+    return str(value)
+
+
+def encode_airport_binary(records):
+    """
+    Airport records (dicts with AirportID, AirportName, City, State) as the
+    bytes of a binary index.
+    """
+    records = sorted(records, key=lambda r: r['AirportID'])
+    ids = array('i', (int(r['AirportID']) for r in records))
+    strings = [
+        _text(value).encode('utf-8')
+        for r in records
+        for value in (r['AirportName'], r['City'], r['State'])
+    ]
+    lengths = array('H', (len(value) for value in strings))
+    return b''.join((
+        _HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(records)),
+        _little_endian(ids).tobytes(),
+        _little_endian(lengths).tobytes(),
+        *strings
+    ))
+
+
+def write_airport_binary(data, path):
+    """Atomically write encode_airport_binary() bytes to path."""
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+
+
+def save_airport_binary(records, path):
+    """Write airport records as a binary index."""
+    write_airport_binary(encode_airport_binary(records), path)
+
+
+def _read_binary(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, count = _HEADER.unpack_from(data)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError(f"{path} is not a version {BINARY_VERSION} airport index")
+
+    start = _HEADER.size
+    ids = array('i')
+    ids.frombytes(data[start:start + 4 * count])
+    start += 4 * count
+    lengths = array('H')
+    lengths.frombytes(data[start:start + 2 * 3 * count])
+    start += 2 * 3 * count
+    _little_endian(ids)
+    _little_endian(lengths)
+
+    ends = list(accumulate(lengths, initial=start))
+    strings = [data[begin:end].decode('utf-8') for begin, end in zip(ends, ends[1:])]
+    return [
+        {'AirportID': airport_id, 'AirportName': strings[3 * i], 'City': strings[3 * i + 1],
+         'State': strings[3 * i + 2]}
+        for i, airport_id in enumerate(ids)
+    ]
+
+
+def load_airport_index(path):
+    """Read a binary airport index (.bin) or an airports.csv file into an AirportIndex."""
+    if path.endswith('.bin'):
+        return AirportIndex(_read_binary(path))
+
+    with open(path, newline='', encoding='utf-8') as f:
+        records = [
+            {
+                'AirportID': int(row['AirportID']),
+                'AirportName': row['AirportName'],
+                'City': row['City'],
+                'State': row['State']
+            }
+            for row in csv.DictReader(f)
+        ]
+    return AirportIndex(records)
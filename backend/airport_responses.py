@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Pre-serialized Airport Responses
+================================
+
+The airport list only changes when new model artifacts are deployed, so each
+airport is encoded to JSON once at startup and /airports pages are assembled
+by joining ready-made bytes.
+"""
+
+import hashlib
+import json
+
+
+def _dumps(value):
+    """Encode JSON exactly like FastAPI's JSONResponse."""
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode('utf-8')
+
+
+def _airports_body(total, items):
+    return b''.join((b'{"total":', str(total).encode(), b',"airports":[', b','.join(items), b']}'))
+
+
+class SerializedAirports:
+    """JSON bytes for every airport, in the order served by /airports."""
+
+    def __init__(self, records):
+        self.items = [
+            _dumps({
+                'airport_id': record['AirportID'],
+                'airport_name': record['AirportName'],
+                'city': record['City'],
+                'state': record['State']
+            })
+            for record in records
+        ]
+        self.total = len(self.items)
+        self.digest = hashlib.sha256(b'\n'.join(self.items)).hexdigest()[:32]
+
+    def page(self, offset, limit):
+        """Return the AirportsResponse body for a page as bytes."""
+        return _airports_body(self.total, self.items[offset:offset + limit])
+
+    def matches(self, total, positions):
+        """Return the AirportsResponse body for search results, given their positions in this list."""
+        return _airports_body(total, [self.items[position] for position in positions])
+
+    def etag(self, offset, limit):
+        """Strong ETag for a page, derived from the airport data and page bounds."""
+        return f'"{self.digest}-{offset}-{limit}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Check an If-None-Match header value against an ETag (weak comparison, per RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
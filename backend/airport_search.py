@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Airport Search
+==============
+
+Prefix index behind /airports/search, built once per model bundle.
+
+Every airport contributes search keys: its full name and city, each word of
+its name and city, its state and its ID. The keys are normalized (case-folded,
+punctuation removed) and kept in one sorted list, so all keys starting with a
+query are one contiguous slice found with two bisects. A query costs a few
+microseconds plus the number of matching keys, however many airports there are.
+
+Matches are ranked by how they matched, then by name:
+1. the airport name starts with the query
+2. the city starts with the query, or the query is the state or the ID
+3. any other word of the name or city starts with the query
+"""
+
+import re
+from bisect import bisect_left
+
+# Apostrophes and periods join their word ("O'Hare" -> "ohare"); other
+# punctuation separates words ("Dallas/Fort Worth" -> "dallas fort worth")
+_JOINERS = re.compile(r"['’.]")
+_SEPARATORS = re.compile(r"[\W_]+")
+
+NAME_MATCH = 0
+CITY_MATCH = 1
+WORD_MATCH = 2
+
+
+def normalize(text):
+    """Case-folded text with punctuation removed and words separated by single spaces."""
+    return _SEPARATORS.sub(' ', _JOINERS.sub('', str(text).casefold())).strip()
+
+
+class AirportSearch:
+    """Sorted prefix index over airport names, cities, states and IDs."""
+
+    def __init__(self, records):
+        """
+        Args:
+            records: Airport records (dicts with AirportID, AirportName, City,
+                State), in the order results are ranked by within a tier
+        """
+        self.size = len(records)
+        entries = set()
+        for position, record in enumerate(records):
+            name = normalize(record['AirportName'])
+            city = normalize(record['City'])
+            keys = [(name, NAME_MATCH), (city, CITY_MATCH), (normalize(record['State']), CITY_MATCH),
+                    (str(record['AirportID']), CITY_MATCH)]
+            keys.extend((word, WORD_MATCH) for word in f'{name} {city}'.split())
+            # One number per match, ordered by tier and then by position
+            entries.update((key, tier * self.size + position) for key, tier in keys if key)
+
+        entries = sorted(entries)
+        self.keys = [key for key, _ in entries]
+        self.ranks = [rank for _, rank in entries]
+
+    def search(self, query, limit):
+        """
+        Positions of the airports matching a query, best matches first.
+
+        Returns:
+            Tuple of (number of matching airports, up to limit positions)
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return 0, []
+
+        start = bisect_left(self.keys, prefix)
+        # Every key starting with the prefix sorts before the prefix followed by
+        # the highest code point
+        end = bisect_left(self.keys, prefix + '\U0010ffff', start)
+
+        best = {}
+        for rank in self.ranks[start:end]:
+            position = rank % self.size
+            if rank < best.get(position, rank + 1):
+                best[position] = rank
+
+        ranked = sorted(best.values())[:limit]
+        return len(best), [rank % self.size for rank in ranked]
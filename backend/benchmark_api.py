@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Load and latency benchmark for the Flight Delay Prediction API
+==============================================================
+
+Drives the API either in-process (ASGI transport, no network) or against a
+running server at a configurable concurrency, and reports p50/p95/p99 latency
+and requests/sec per endpoint. Each run is appended as one JSON line to a
+results file so runs can be compared across commits.
+
+Request mixes are JSONL files with one request per line, e.g.
+    {"method": "POST", "path": "/predict", "json": {"day_of_week": 5, ...}}
+    {"method": "GET", "path": "/airports?limit=1000"}
+
+Usage:
+    python benchmark_api.py                       # in-process, generated mix
+    python benchmark_api.py --url http://localhost:8000 --concurrency 32
+    python benchmark_api.py --record-mix mix.jsonl
+    python benchmark_api.py --mix mix.jsonl --requests 20000
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(SCRIPT_DIR, 'benchmark_results.jsonl')
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Benchmark the Flight Delay Prediction API.")
+    parser.add_argument('--url', help="Base URL of a running server (default: run the app in-process)")
+    parser.add_argument('--concurrency', type=int, default=16, help="Concurrent clients (default: 16)")
+    parser.add_argument('--requests', type=int, default=5000, help="Total requests to send (default: 5000)")
+    parser.add_argument('--warmup', type=int, default=200, help="Untimed requests sent first (default: 200)")
+    parser.add_argument('--mix', help="JSONL request mix to replay (default: generated)")
+    parser.add_argument('--record-mix', help="Write the generated request mix to this JSONL file and exit")
+    parser.add_argument('--mix-size', type=int, default=1000, help="Requests in a generated mix (default: 1000)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="JSONL file the results are appended to")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for generated mixes")
+    return parser.parse_args()
+
+def generate_mix(airport_ids, size, seed):
+    """Mostly single predictions, with some weekly batches and airport listings."""
+    rng = random.Random(seed)
+    mix = []
+    for _ in range(size):
+        origin, dest = rng.sample(airport_ids, 2)
+        kind = rng.random()
+        if kind < 0.80:
+            mix.append({'method': 'POST', 'path': '/predict', 'json': {
+                'day_of_week': rng.randint(1, 7), 'origin_airport_id': origin, 'dest_airport_id': dest
+            }})
+        elif kind < 0.90:
+            mix.append({'method': 'POST', 'path': '/predict/batch', 'json': {'predictions': [
+                {'day_of_week': day, 'origin_airport_id': origin, 'dest_airport_id': dest}
+                for day in range(1, 8)
+            ]}})
+        elif kind < 0.98:
+            mix.append({'method': 'GET', 'path': '/airports?limit=1000'})
+        else:
+            mix.append({'method': 'GET', 'path': '/health'})
+    return mix
+
+def load_mix(path):
+    """Read a JSONL request mix."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def endpoint_name(entry):
+    """Group requests by method and path without the query string."""
+    return f"{entry['method']} {entry['path'].split('?')[0]}"
+
+async def run_load(client, mix, total, concurrency):
+    """Send total requests cycling through mix, with concurrency clients."""
+    requests = itertools.islice(itertools.cycle(mix), total)
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+
+    async def worker():
+        for entry in requests:
+            start = time.perf_counter()
+            try:
+                response = await client.request(entry['method'], entry['path'], json=entry.get('json'))
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 'error'
+            name = endpoint_name(entry)
+            latencies[name].append((time.perf_counter() - start) * 1000)
+            statuses[name][str(status)] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - start
+
+def summarize(latencies, elapsed):
+    """Latency percentiles and throughput for a list of latencies in ms."""
+    values = np.array(latencies)
+    return {
+        'requests': len(values),
+        'rps': len(values) / elapsed,
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(values.max())
+    }
+
+def git_commit():
+    """Current commit hash, if the benchmark runs inside the git checkout."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def benchmark(args):
+    """Run warmup and timed load, returning the result record."""
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        import main
+        await main.load_model()
+        transport = httpx.ASGITransport(app=main.app)
+        base_url = 'http://benchmark'
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url, timeout=30,
+        limits=httpx.Limits(max_connections=args.concurrency)
+    ) as client:
+        if args.mix:
+            mix = load_mix(args.mix)
+        else:
+            response = await client.get('/airports?limit=1000')
+            airport_ids = [a['airport_id'] for a in response.json()['airports']]
+            mix = generate_mix(airport_ids, args.mix_size, args.seed)
+
+        if args.record_mix:
+            with open(args.record_mix, 'w') as f:
+                for entry in mix:
+                    f.write(json.dumps(entry) + '\n')
+            print(f"Wrote {len(mix)} requests to {args.record_mix}")
+            return None
+
+        print(f"Warming up with {args.warmup} requests...")
+        await run_load(client, mix, args.warmup, args.concurrency)
+
+        print(f"Sending {args.requests} requests with concurrency {args.concurrency}...")
+        latencies, statuses, elapsed = await run_load(client, mix, args.requests, args.concurrency)
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'target': args.url or 'in-process',
+        'concurrency': args.concurrency,
+        'mix': args.mix or f'generated(size={args.mix_size}, seed={args.seed})',
+        'elapsed_s': elapsed,
+        'overall': summarize(all_latencies, elapsed),
+        'endpoints': {
+            name: {**summarize(values, elapsed), 'status_codes': dict(statuses[name])}
+            for name, values in sorted(latencies.items())
+        }
+    }
+
+def print_results(result):
+    """Print a result record as a table."""
+    print(f"\n{'endpoint':<22} {'requests':>9} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  status codes")
+    rows = list(result['endpoints'].items()) + [('overall', result['overall'])]
+    for name, stats in rows:
+        codes = ', '.join(f"{code}: {count}" for code, count in stats.get('status_codes', {}).items())
+        print(
+            f"{name:<22} {stats['requests']:>9} {stats['rps']:>9.1f} {stats['p50_ms']:>8.2f} "
+            f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}  {codes}"
+        )
+
+def main():
+    """Run the benchmark."""
+    args = parse_args()
+
+    print("=" * 50)
+    print("Flight Delay Prediction API - Load Benchmark")
+    print("=" * 50)
+
+    try:
+        result = asyncio.run(benchmark(args))
+    except httpx.ConnectError:
+        print(f"\n✗ Cannot connect to {args.url}; please start the server first.")
+        sys.exit(1)
+
+    if result is None:
+        return
+
+    print_results(result)
+
+    with open(args.output, 'a') as f:
+        f.write(json.dumps(result) + '\n')
+    print(f"\nResults appended to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Flight Delay Prediction API
+========================================================
+
+Measures how long a fresh process takes to become useful, per inference
+engine:
+
+- import: `import main` in a new interpreter
+- load: the startup hook (model, encoders, airports, prediction table)
+- first /health: from launching uvicorn to the first successful /health
+
+It also lists which heavy libraries (pandas, sklearn, joblib, ...) the process
+imported. With the compiled engine and current artifacts (model arrays,
+label_classes.json, airports.bin) the API serves on NumPy alone; any heavy
+module in that list points at a legacy artifact or a regression.
+
+Each run is appended as one JSON line (with the git commit) to
+startup_results.jsonl.
+
+Usage:
+    python benchmark_startup.py
+    python benchmark_startup.py --engine compiled --runs 10
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+
+from benchmark_api import git_commit
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(SCRIPT_DIR, 'startup_results.jsonl')
+
+HEAVY_MODULES = ('pandas', 'sklearn', 'joblib', 'scipy', 'pyarrow')
+
+# Runs in a fresh interpreter and prints one JSON line
+IMPORT_PROBE = f"""
+import asyncio, json, logging, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+logging.disable(logging.INFO)
+asyncio.run(main.load_model())
+loaded = time.perf_counter()
+print(json.dumps({{
+    'import_s': imported - start,
+    'load_s': loaded - imported,
+    'heavy_modules': [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+}}))
+"""
+
+HEALTH_TIMEOUT_SECONDS = 120
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Benchmark cold start of the Flight Delay Prediction API.")
+    parser.add_argument('--engine', choices=('sklearn', 'compiled', 'both'), default='both',
+                        help="Inference engine to start with (default: both)")
+    parser.add_argument('--runs', type=int, default=5, help="Cold starts per engine (default: 5)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="JSONL file the results are appended to")
+    return parser.parse_args()
+
+
+def free_port():
+    """An unused local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def probe_imports(env):
+    """Import and load times and heavy modules of one fresh interpreter."""
+    output = subprocess.check_output(
+        [sys.executable, '-c', IMPORT_PROBE], cwd=SCRIPT_DIR, env=env, text=True, stderr=subprocess.DEVNULL
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def time_to_first_health(env):
+    """Seconds from launching uvicorn until /health first answers 200."""
+    port = free_port()
+    url = f'http://127.0.0.1:{port}/health'
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=SCRIPT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < HEALTH_TIMEOUT_SECONDS:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with status {server.returncode} before serving /health")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError, OSError):
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"/health did not answer within {HEALTH_TIMEOUT_SECONDS}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def benchmark_engine(engine, runs):
+    """Median cold-start timings over several runs with one engine."""
+    env = {**os.environ, 'FLIGHT_DELAY_INFERENCE_ENGINE': engine, 'FLIGHT_DELAY_MODEL_WATCH_SECONDS': '0'}
+    # Untimed start, so every timed run finds the prediction table already cached
+    probe_imports(env)
+
+    probes = []
+    health = []
+    for run in range(runs):
+        probes.append(probe_imports(env))
+        health.append(time_to_first_health(env))
+        print(f"  {engine} run {run + 1}/{runs}: import {probes[-1]['import_s']:.2f}s, "
+              f"load {probes[-1]['load_s']:.2f}s, first /health {health[-1]:.2f}s")
+
+    return {
+        'import_s': statistics.median(p['import_s'] for p in probes),
+        'load_s': statistics.median(p['load_s'] for p in probes),
+        'first_health_s': statistics.median(health),
+        'heavy_modules': probes[-1]['heavy_modules'],
+    }
+
+
+def print_results(result):
+    """Print the median timings per engine."""
+    print("\nCold start (median)")
+    print("=" * 50)
+    print(f"{'engine':<10} {'import s':>9} {'load s':>8} {'/health s':>10}  heavy modules")
+    for engine, r in result['engines'].items():
+        print(f"{engine:<10} {r['import_s']:>9.2f} {r['load_s']:>8.2f} {r['first_health_s']:>10.2f}  "
+              f"{', '.join(r['heavy_modules']) or 'none'}")
+
+
+def main():
+    """Run the benchmark and append the results."""
+    args = parse_args()
+    engines = ('sklearn', 'compiled') if args.engine == 'both' else (args.engine,)
+
+    print("Flight Delay Prediction API - Cold Start Benchmark")
+    print("=" * 50)
+
+    result = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'runs': args.runs,
+        'engines': {engine: benchmark_engine(engine, args.runs) for engine in engines}
+    }
+    print_results(result)
+
+    with open(args.output, 'a') as f:
+        f.write(json.dumps(result) + '\n')
+    print(f"\nResults appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
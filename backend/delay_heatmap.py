@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Delay Heatmap
+=============
+
+Delay probability for every (origin, destination, day of week), with the
+other features at their defaults, stored as a uint8 tensor quantized to
+steps of 1/255. For a few hundred airports the whole network fits in well
+under a megabyte. Questions like "the riskiest routes on Fridays" or "every
+destination from one origin" then become a NumPy slice and a partial sort
+instead of thousands of forest evaluations.
+"""
+
+import numpy as np
+
+DAYS_OF_WEEK = 7
+
+# Quantization scale: probability p is stored as round(p * QUANTIZATION_LEVELS)
+QUANTIZATION_LEVELS = 255
+
+
+class DelayHeatmap:
+    """Quantized delay probabilities indexed by [origin_pos, dest_pos, day_of_week - 1]."""
+
+    def __init__(self, airport_ids, quantized):
+        self.airport_ids = np.asarray(airport_ids)
+        self.quantized = quantized
+        self.airport_positions = {int(a): i for i, a in enumerate(self.airport_ids)}
+
+    @classmethod
+    def from_probabilities(cls, airport_ids, delay_probabilities):
+        """
+        Quantize delay probabilities shaped (day, origin, dest), as laid out by
+        the prediction table, into an origin-major tensor.
+        """
+        quantized = np.rint(np.asarray(delay_probabilities) * QUANTIZATION_LEVELS).astype(np.uint8)
+        # Origin-major, so one origin's destinations and days are a contiguous block
+        return cls(airport_ids, np.ascontiguousarray(quantized.transpose(1, 2, 0)))
+
+    def query(self, origin_airport_id=None, dest_airport_id=None, day_of_week=None, limit=None):
+        """
+        Routes matching the filters, riskiest first.
+
+        Routes from an airport to itself are excluded. Ties keep origin,
+        destination, day order.
+
+        Args:
+            origin_airport_id: Only routes from this airport (all IDs must be in the heatmap)
+            dest_airport_id: Only routes to this airport
+            day_of_week: Only this day (1=Monday, 7=Sunday)
+            limit: Return at most this many routes
+
+        Returns:
+            Tuple of (total matching routes, list of (origin_id, dest_id, day_of_week, probability))
+        """
+        n_airports = len(self.airport_ids)
+        origins = np.arange(n_airports) if origin_airport_id is None else \
+            np.array([self.airport_positions[origin_airport_id]])
+        dests = np.arange(n_airports) if dest_airport_id is None else \
+            np.array([self.airport_positions[dest_airport_id]])
+        days = np.arange(DAYS_OF_WEEK) if day_of_week is None else np.array([day_of_week - 1])
+
+        values = self.quantized[np.ix_(origins, dests, days)]
+        # Mask self-routes, then flatten in (origin, dest, day) order
+        keep = (origins[:, np.newaxis, np.newaxis] != dests[np.newaxis, :, np.newaxis]) \
+            & np.ones(len(days), dtype=bool)
+        flat_index = np.flatnonzero(keep)
+        flat_values = values.ravel()[flat_index]
+        total = len(flat_index)
+
+        # Higher probability first, then earlier position: one integer sort key
+        rank = np.arange(total, dtype=np.int64) - flat_values.astype(np.int64) * total
+        if limit is not None and limit < total:
+            # Partial sort: only the top `limit` routes are ordered
+            candidates = np.argpartition(rank, limit - 1)[:limit]
+            order = candidates[np.argsort(rank[candidates])]
+        else:
+            order = np.argsort(rank)
+
+        o, d, t = np.unravel_index(flat_index[order], values.shape)
+        routes = [
+            (int(self.airport_ids[origins[i]]), int(self.airport_ids[dests[j]]), int(days[k]) + 1,
+             float(q) / QUANTIZATION_LEVELS)
+            for i, j, k, q in zip(o, d, t, flat_values[order])
+        ]
+        return total, routes
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Inference Pool
+==============
+
+Runs CPU-bound model scoring on a bounded thread pool so it never blocks the
+asyncio event loop. sklearn's tree traversal and NumPy release the GIL, so
+threads score in parallel while the loop keeps serving health checks and
+airport listings.
+
+When every worker is busy and the queue is full, callers get PoolFullError
+right away instead of piling up behind the backlog. A job counts against the
+cap until it finishes on its thread, even if the request that started it was
+cancelled in the meantime.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PoolFullError(Exception):
+    """Raised when the pool already has max_workers + max_queue jobs in flight."""
+
+
+class InferencePool:
+    """Thread pool with a cap on running plus queued jobs."""
+
+    def __init__(self, max_workers, max_queue):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='inference'
+        )
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the pool, or raise PoolFullError if it is saturated."""
+        with self._lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                raise PoolFullError(
+                    f"{self.pending} inference jobs in flight "
+                    f"({self.max_workers} workers, queue limit {self.max_queue})"
+                )
+            self.pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        # Released when the job is done (or cancelled while still queued), not when
+        # the caller stops waiting: a cancelled request's job may still be running
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future):
+        with self._lock:
+            self.pending -= 1
+
+    def shutdown(self):
+        """Stop accepting jobs and wait for running ones to finish."""
+        self._executor.shutdown(wait=True)
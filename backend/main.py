@@ -6,15 +6,42 @@ Flight Delay Prediction API
 FastAPI application for predicting flight delays and retrieving airport information.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, field_validator
-import joblib
-import pandas as pd
+import numpy as np
+import asyncio
+import functools
+import hmac
 import json
 import os
+import random
+import time
+from datetime import datetime, timezone
 from typing import List, Optional
 import logging
+import sys
+
+# Shared project modules live in the repository root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from airport_index import airport_index_path, load_airport_index
+from airport_responses import SerializedAirports, etag_matches
+from airport_search import AirportSearch
+from delay_heatmap import DelayHeatmap
+from flight_features import UNKNOWN_CODE, FeatureBuilder, load_label_classes
+from forest_engine import inference_engine_from_env, load_model as load_forest, takes_arrays
+from inference_pool import InferencePool, PoolFullError
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, MetricsRegistry
+from model_bundle import ModelBundle, artifacts_fingerprint
+from prediction_batcher import PredictionBatcher
+from prediction_cache import PredictionCache
+from process_memory import format_usage, memory_usage
+from prediction_table import (
+    artifact_fingerprint, build_prediction_table, load_or_build_prediction_table
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -36,17 +63,119 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global variables for model and data
-model = None
-label_encoders = None
-feature_columns = None
-airports_df = None
+# Prometheus metrics, served at /metrics
+metrics = MetricsRegistry()
+REQUEST_SECONDS = metrics.histogram(
+    'flight_delay_request_duration_seconds', "Request latency by route", ('method', 'endpoint')
+)
+REQUESTS_TOTAL = metrics.counter(
+    'flight_delay_requests_total', "Requests by route and status code", ('method', 'endpoint', 'status')
+)
+ERRORS_TOTAL = metrics.counter(
+    'flight_delay_errors_total', "Responses with a 4xx or 5xx status, by route", ('method', 'endpoint', 'status')
+)
+VALIDATION_SECONDS = metrics.histogram(
+    'flight_delay_validation_seconds', "Time spent validating prediction requests", ('endpoint',)
+)
+FEATURE_BUILD_SECONDS = metrics.histogram(
+    'flight_delay_feature_build_seconds',
+    "Time spent encoding request fields (encode) and assembling model input (matrix)", ('step',)
+)
+INFERENCE_SECONDS = metrics.histogram(
+    'flight_delay_inference_seconds',
+    "Time spent computing probabilities, by prediction table lookup or model evaluation", ('source',)
+)
+PREDICTION_CACHE_TOTAL = metrics.counter(
+    'flight_delay_prediction_cache_total', "Prediction cache lookups by result", ('result',)
+)
+INFERENCE_PENDING = metrics.gauge(
+    'flight_delay_inference_pending', "Model calls running or queued on the inference pool"
+)
+
+# Outermost, so latency includes the other middleware and error responses are counted
+app.add_middleware(MetricsMiddleware, latency=REQUEST_SECONDS, requests=REQUESTS_TOTAL, errors=ERRORS_TOTAL)
+
+MODELS_DIR = os.path.join(PROJECT_ROOT, 'models')
+
+# Serve /predict from a precomputed probability table (set to 0 to score per request)
+USE_PREDICTION_TABLE = os.environ.get('FLIGHT_DELAY_PREDICTION_TABLE', '1') == '1'
+
+# Build the quantized route delay tensor behind /heatmap (set to 0 to disable)
+USE_DELAY_HEATMAP = os.environ.get('FLIGHT_DELAY_HEATMAP', '1') == '1'
+
+# 'sklearn' or 'compiled' (flat-array forest traversal, bit-identical output)
+INFERENCE_ENGINE = inference_engine_from_env()
+
+# How long browsers and CDNs may reuse an /airports page before revalidating
+AIRPORTS_CACHE_MAX_AGE = 3600
+
+# Model scoring runs on a bounded thread pool; requests beyond workers + queue get a 503
+INFERENCE_THREADS = int(os.environ.get('FLIGHT_DELAY_INFERENCE_THREADS', '4'))
+INFERENCE_QUEUE_LIMIT = int(os.environ.get('FLIGHT_DELAY_INFERENCE_QUEUE', '64'))
+RETRY_AFTER_SECONDS = 1
+
+# Opt-in micro-batching: concurrent /predict calls arriving within this many
+# milliseconds are scored in one model call (0 disables it)
+BATCH_WAIT_MS = float(os.environ.get('FLIGHT_DELAY_BATCH_WAIT_MS', '0'))
+BATCH_MAX_SIZE = int(os.environ.get('FLIGHT_DELAY_BATCH_MAX_SIZE', '64'))
+
+# LRU cache of /predict results scored by the model rather than the table
+# (0 disables it); entries optionally expire after a TTL in seconds
+PREDICTION_CACHE_SIZE = int(os.environ.get('FLIGHT_DELAY_PREDICTION_CACHE_SIZE', '10000'))
+PREDICTION_CACHE_TTL = float(os.environ.get('FLIGHT_DELAY_PREDICTION_CACHE_TTL', '0')) or None
+
+# Poll models/ every this many seconds and hot-reload changed artifacts (0 disables it)
+MODEL_WATCH_SECONDS = float(os.environ.get('FLIGHT_DELAY_MODEL_WATCH_SECONDS', '0'))
+
+# Fraction of /predict calls logged at INFO (0 disables it); every call is logged at DEBUG
+PREDICTION_LOG_SAMPLE_RATE = float(os.environ.get('FLIGHT_DELAY_PREDICTION_LOG_SAMPLE_RATE', '0'))
+
+# Shared secret for POST /admin/reload; the endpoint is disabled when unset
+ADMIN_TOKEN = os.environ.get('FLIGHT_DELAY_ADMIN_TOKEN')
+
+# Upper bound on the number of routes scored by one /predict/batch call
+MAX_BATCH_SIZE = 1000
+
+# Upper bound on the number of routes returned by one /heatmap call
+MAX_HEATMAP_ROUTES = 10000
+
+# Upper bound on the number of matches returned by one /airports/search call
+MAX_SEARCH_RESULTS = 50
+
+# Features a request leaves out are pinned to typical values from the dataset
+DEFAULT_FEATURES = {
+    'Month': 6,  # Mid-year default
+    'DayofMonth': 15,  # Mid-month default
+    'CRSDepTime_Hour': 12,  # Noon default
+    'CRSArrTime_Hour': 14,  # 2 PM default
+    'Carrier': 0  # Default encoded carrier
+}
+
+# Optional request fields and the numeric feature each one sets
+OPTIONAL_NUMERIC_FEATURES = {
+    'month': 'Month',
+    'day_of_month': 'DayofMonth',
+    'departure_hour': 'CRSDepTime_Hour',
+    'arrival_hour': 'CRSArrTime_Hour'
+}
+
+# Global state: the bundle currently being served is replaced as a whole on reload
+bundle = None
+inference_pool = InferencePool(INFERENCE_THREADS, INFERENCE_QUEUE_LIMIT)
+reload_in_progress = False
+watch_task = None
+preloaded = False
 
 # Request/Response Models
 class PredictionRequest(BaseModel):
     day_of_week: int = Field(..., ge=1, le=7, description="Day of the week (1=Monday, 7=Sunday)")
     origin_airport_id: int = Field(..., description="ID of the origin airport")
     dest_airport_id: int = Field(..., description="ID of the destination airport")
+    month: Optional[int] = Field(None, ge=1, le=12, description="Month of the flight (default: 6)")
+    day_of_month: Optional[int] = Field(None, ge=1, le=31, description="Day of the month (default: 15)")
+    departure_hour: Optional[int] = Field(None, ge=0, le=23, description="Scheduled departure hour (default: 12)")
+    arrival_hour: Optional[int] = Field(None, ge=0, le=23, description="Scheduled arrival hour (default: 14)")
+    carrier: Optional[str] = Field(None, description="Airline carrier code, e.g. 'AA' (default: first carrier code)")
     
     @field_validator('day_of_week')
     @classmethod
@@ -54,18 +183,42 @@ class PredictionRequest(BaseModel):
         if v < 1 or v > 7:
             raise ValueError('day_of_week must be between 1 and 7')
         return v
+    
+    @field_validator('carrier')
+    @classmethod
+    def normalize_carrier(cls, v):
+        return None if v is None else v.strip().upper()
 
 class PredictionResponse(BaseModel):
     delay_probability: float = Field(..., ge=0, le=1, description="Probability of delay > 15 minutes")
     confidence: float = Field(..., ge=0, le=1, description="Confidence level of prediction")
     prediction: str = Field(..., description="Human-readable prediction result")
 
+class BatchPredictionRequest(BaseModel):
+    predictions: List[PredictionRequest] = Field(
+        ..., min_length=1, max_length=MAX_BATCH_SIZE,
+        description="Routes to score in a single call"
+    )
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse] = Field(..., description="Predictions in request order")
+
 class Airport(BaseModel):
     airport_id: int
     airport_name: str
     city: str
     state: str
 
+class HeatmapRoute(BaseModel):
+    origin_airport_id: int
+    dest_airport_id: int
+    day_of_week: int
+    delay_probability: float = Field(..., ge=0, le=1, description="Delay probability, quantized to steps of 1/255")
+
+class HeatmapResponse(BaseModel):
+    total: int = Field(..., description="Number of routes matching the filters")
+    routes: List[HeatmapRoute] = Field(..., description="Matching routes, riskiest first")
+
 class AirportsResponse(BaseModel):
     total: int
     airports: List[Airport]
@@ -78,39 +231,321 @@ class HealthResponse(BaseModel):
     status: str
     model_loaded: bool
 
+class CacheStatsResponse(BaseModel):
+    enabled: bool
+    size: int = 0
+    max_size: int = 0
+    ttl_seconds: Optional[float] = None
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    hit_rate: float = 0.0
+
+class ReloadResponse(BaseModel):
+    status: str
+    fingerprint: str
+    loaded_at: str
+
+def load_bundle(models_dir):
+    """
+    Load and validate every model artifact in models_dir.
+    
+    Runs off the event loop during reloads, so it must not touch global state.
+    
+    Returns:
+        ModelBundle ready to serve
+    """
+    # Fingerprint before reading, so changes made while loading trigger another reload
+    fingerprint = artifacts_fingerprint(models_dir)
+    
+    logger.info(f"Loading model from {models_dir} (inference engine: {INFERENCE_ENGINE})")
+    
+    # Load model and encoders
+    # The compiled engine memory-maps the array artifact when it exists, and
+    # encoder classes come from JSON, so neither sklearn nor pandas is imported
+    model, model_path = load_forest(models_dir, INFERENCE_ENGINE)
+    label_classes = load_label_classes(models_dir)
+    
+    # Load feature columns
+    with open(os.path.join(models_dir, 'feature_columns.json'), 'r') as f:
+        feature_columns = json.load(f)
+    
+    # Load airports data from the binary index (airports.csv for older models)
+    airports_path = airport_index_path(models_dir)
+    airport_index = load_airport_index(airports_path)
+    
+    # Carrier codes are looked up in a dict precomputed from the encoder
+    feature_builder = FeatureBuilder(
+        label_classes, feature_columns, DEFAULT_FEATURES, as_frame=not takes_arrays(model)
+    )
+    
+    smoke_test(model, feature_builder, airport_index)
+    
+    prediction_table = None
+    prediction_batcher = None
+    prediction_cache = None
+    
+    # Precompute every servable prediction; cached next to the model and
+    # rebuilt whenever the model or airport artifacts change
+    if USE_PREDICTION_TABLE:
+        table_fingerprint = artifact_fingerprint(
+            [model_path, airports_path, os.path.join(models_dir, 'feature_columns.json')],
+            DEFAULT_FEATURES
+        )
+        prediction_table = load_or_build_prediction_table(
+            model, feature_columns, airport_index.ids_by_name, DEFAULT_FEATURES,
+            os.path.join(models_dir, 'prediction_table.npz'), table_fingerprint
+        )
+    
+    # Route-level delay tensor for /heatmap, taken from the table when there is one
+    delay_heatmap = None
+    if USE_DELAY_HEATMAP:
+        source = prediction_table or build_prediction_table(
+            model, feature_columns, airport_index.ids_by_name, DEFAULT_FEATURES
+        )
+        delay_heatmap = DelayHeatmap.from_probabilities(source.airport_ids, source.probabilities[..., 1])
+    
+    # Requests the table does not cover (non-default features) are scored by the model
+    if BATCH_WAIT_MS > 0:
+        prediction_batcher = PredictionBatcher(
+            functools.partial(run_model_rows, model, feature_builder), BATCH_MAX_SIZE, BATCH_WAIT_MS
+        )
+        logger.info(f"Batching /predict calls: up to {BATCH_MAX_SIZE} within {BATCH_WAIT_MS} ms")
+    # A fresh cache per bundle, so results from a previous model are never served
+    if PREDICTION_CACHE_SIZE > 0:
+        prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+    
+    return ModelBundle(
+        model=model,
+        label_classes=label_classes,
+        feature_columns=feature_columns,
+        feature_builder=feature_builder,
+        airport_index=airport_index,
+        serialized_airports=SerializedAirports(airport_index.sorted_by_name),
+        airport_search=AirportSearch(airport_index.sorted_by_name),
+        fingerprint=fingerprint,
+        loaded_at=time.time(),
+        prediction_table=prediction_table,
+        delay_heatmap=delay_heatmap,
+        prediction_cache=prediction_cache,
+        prediction_batcher=prediction_batcher
+    )
+
+def smoke_test(model, feature_builder, airport_index):
+    """Score one route and check the model returns a valid probability row."""
+    if len(airport_index) < 2:
+        raise ValueError("Smoke test failed: fewer than two airports loaded")
+    origin, dest = airport_index.ids_by_name[:2]
+    probabilities = model.predict_proba(feature_builder.build(1, {
+        'DayOfWeek': 1, 'OriginAirportID': origin, 'DestAirportID': dest
+    }))
+    if (
+        probabilities.shape != (1, len(model.classes_))
+        or not np.all(np.isfinite(probabilities))
+        or not np.isclose(probabilities.sum(), 1.0)
+    ):
+        raise ValueError(f"Smoke test failed: unexpected probabilities {probabilities!r}")
+
+def preload_model():
+    """
+    Load the model before the app starts serving, e.g. in serve.py's parent
+    process so forked workers share it; the startup hook then keeps it.
+    """
+    global bundle, preloaded
+    bundle = load_bundle(MODELS_DIR)
+    preloaded = True
+    logger.info(f"Preloaded model in process {os.getpid()}: {format_usage(memory_usage())}")
+
 # Startup event to load model
 @app.on_event("startup")
 async def load_model():
     """Load the trained model and associated data on startup."""
-    global model, label_encoders, feature_columns, airports_df
+    global bundle, watch_task
+    
+    if preloaded:
+        # Inherited from a preloading parent process
+        logger.info(f"Worker {os.getpid()} serving the preloaded model: {format_usage(memory_usage())}")
+    else:
+        try:
+            bundle = load_bundle(MODELS_DIR)
+            
+            logger.info("Model and data loaded successfully!")
+            logger.info(f"Available airports: {len(bundle.airport_index)}")
+            
+        except Exception as e:
+            logger.error(f"Failed to load model: {e}")
+            raise
+    
+    if MODEL_WATCH_SECONDS > 0 and watch_task is None:
+        watch_task = asyncio.ensure_future(watch_models())
+
+async def reload_model():
+    """
+    Load the artifacts on disk in the background and swap them in.
+    
+    The current bundle keeps serving until the new one has loaded and passed
+    the smoke test; if loading fails it stays in place.
+    
+    Returns:
+        The newly published ModelBundle
+    """
+    global bundle, reload_in_progress
     
+    reload_in_progress = True
     try:
-        # Determine the correct path to models directory
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        models_dir = os.path.join(base_dir, 'models')
-        
-        logger.info(f"Loading model from {models_dir}")
-        
-        # Load model and encoders
-        model = joblib.load(os.path.join(models_dir, 'flight_delay_model.pkl'))
-        label_encoders = joblib.load(os.path.join(models_dir, 'label_encoders.pkl'))
-        
-        # Load feature columns
-        with open(os.path.join(models_dir, 'feature_columns.json'), 'r') as f:
-            feature_columns = json.load(f)
-        
-        # Load airports data
-        airports_df = pd.read_csv(os.path.join(models_dir, 'airports.csv'))
-        
-        # Sort airports by name for consistent ordering
-        airports_df = airports_df.sort_values('AirportName').reset_index(drop=True)
+        loop = asyncio.get_running_loop()
+        new_bundle = await loop.run_in_executor(None, load_bundle, MODELS_DIR)
+        # A single reference assignment; requests see either the old or the new bundle
+        bundle = new_bundle
+        logger.info(f"Reloaded model (fingerprint {new_bundle.fingerprint[:12]})")
+        return new_bundle
+    finally:
+        reload_in_progress = False
+
+async def watch_models():
+    """Reload when the artifacts change and then stay unchanged for one poll interval."""
+    changed = None
+    failed = None
+    while True:
+        await asyncio.sleep(MODEL_WATCH_SECONDS)
+        try:
+            current = artifacts_fingerprint(MODELS_DIR)
+        except OSError:
+            # An artifact was replaced between listing and stat; look again next time
+            continue
         
-        logger.info("Model and data loaded successfully!")
-        logger.info(f"Available airports: {len(airports_df)}")
+        if current == bundle.fingerprint or current == failed or reload_in_progress:
+            changed = None
+            continue
+        if current != changed:
+            # create_model.py may still be writing; wait for the files to settle
+            changed = current
+            continue
         
-    except Exception as e:
-        logger.error(f"Failed to load model: {e}")
-        raise
+        try:
+            await reload_model()
+        except Exception as e:
+            failed = current
+            logger.error(f"Automatic model reload failed, still serving the previous model: {e}")
+        changed = None
+
+def request_features(feature_builder, requests):
+    """
+    Encoded feature values for PredictionRequests, by feature column.
+    
+    Optional fields a request leaves out take their DEFAULT_FEATURES value.
+    Carriers the model does not know get UNKNOWN_CODE; callers must reject them.
+    """
+    values = {
+        'DayOfWeek': np.array([r.day_of_week for r in requests]),
+        'OriginAirportID': np.array([r.origin_airport_id for r in requests]),
+        'DestAirportID': np.array([r.dest_airport_id for r in requests])
+    }
+    for field, column in OPTIONAL_NUMERIC_FEATURES.items():
+        values[column] = np.array([
+            DEFAULT_FEATURES[column] if getattr(r, field) is None else getattr(r, field)
+            for r in requests
+        ])
+    
+    values['Carrier'] = np.full(len(requests), DEFAULT_FEATURES['Carrier'])
+    given = [i for i, r in enumerate(requests) if r.carrier is not None]
+    if given:
+        # Request lists are small, so plain dict lookups beat a vectorized encode
+        carrier_codes = feature_builder.codes['Carrier']
+        values['Carrier'][given] = [carrier_codes.get(requests[i].carrier, UNKNOWN_CODE) for i in given]
+    return values
+
+def format_prediction(probabilities, classes):
+    """Build a PredictionResponse from one row of class probabilities."""
+    # argmax over classes matches model.predict
+    prediction = classes[probabilities.argmax()]
+    return PredictionResponse(
+        delay_probability=float(probabilities[1]),
+        confidence=float(probabilities.max()),
+        prediction="LIKELY DELAYED" if prediction == 1 else "LIKELY ON TIME"
+    )
+
+def uses_default_features(values):
+    """Whether every flight has the default value for each feature the prediction table fixes."""
+    return all(np.all(values[column] == value) for column, value in DEFAULT_FEATURES.items())
+
+def predict_proba_timed(model, X):
+    """model.predict_proba, observed in the inference histogram."""
+    with INFERENCE_SECONDS.time(source='model'):
+        return model.predict_proba(X)
+
+async def run_model(model, X):
+    """
+    model.predict_proba on the inference pool, without blocking the event loop.
+    
+    Only evaluation is timed, not the wait for a pool thread. A saturated pool
+    becomes a 503 with Retry-After.
+    """
+    try:
+        return await inference_pool.run(predict_proba_timed, model, X)
+    except PoolFullError as e:
+        logger.warning(f"Rejecting prediction: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Prediction service is busy, please retry",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
+
+async def run_model_rows(model, feature_builder, rows):
+    """run_model for a list of complete feature rows."""
+    with FEATURE_BUILD_SECONDS.time(step='matrix'):
+        X = feature_builder.build_rows(rows)
+    return await run_model(model, X)
+
+async def score(current, values):
+    """
+    Class probabilities for encoded feature values, from the bundle's
+    prediction table when it covers them, otherwise from its model.
+    """
+    # Table lookups are cheap enough to run inline
+    if current.prediction_table is not None and uses_default_features(values):
+        with INFERENCE_SECONDS.time(source='table'):
+            return current.prediction_table.lookup_many(
+                values['DayOfWeek'], values['OriginAirportID'], values['DestAirportID']
+            )
+    with FEATURE_BUILD_SECONDS.time(step='matrix'):
+        X = current.feature_builder.build(len(values['DayOfWeek']), values)
+    return await run_model(current.model, X)
+
+async def score_one(current, values):
+    """
+    Class probabilities for a single flight.
+    
+    Flights the prediction table does not cover go through the bundle's
+    cache, keyed on the complete feature row, and its batcher.
+    """
+    if current.prediction_table is not None and uses_default_features(values):
+        return (await score(current, values))[0]
+    
+    row = current.feature_builder.row({column: int(value[0]) for column, value in values.items()})
+    if current.prediction_cache is not None:
+        probabilities = current.prediction_cache.get(row)
+        PREDICTION_CACHE_TOTAL.inc(result='miss' if probabilities is None else 'hit')
+        if probabilities is not None:
+            return probabilities
+    
+    if current.prediction_batcher is not None:
+        probabilities = await current.prediction_batcher.predict(row)
+    else:
+        probabilities = (await run_model_rows(current.model, current.feature_builder, [row]))[0]
+    
+    if current.prediction_cache is not None:
+        # Copy so the cached row does not keep a whole batch result alive
+        current.prediction_cache.put(row, probabilities.copy())
+    return probabilities
+
+@app.on_event("shutdown")
+async def shutdown_inference_pool():
+    """Stop watching for new models and let in-flight scoring finish before the process exits."""
+    if watch_task is not None:
+        watch_task.cancel()
+    inference_pool.shutdown()
 
 # API Endpoints
 @app.get("/", tags=["Root"])
@@ -121,8 +556,13 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "predict": "/predict",
+            "predict_batch": "/predict/batch",
             "airports": "/airports",
+            "airport_search": "/airports/search",
             "health": "/health",
+            "heatmap": "/heatmap",
+            "cache_stats": "/cache/stats",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
@@ -131,10 +571,55 @@ async def root():
 async def health_check():
     """Health check endpoint."""
     return {
-        "status": "healthy" if model is not None else "unhealthy",
-        "model_loaded": model is not None
+        "status": "healthy" if bundle is not None else "unhealthy",
+        "model_loaded": bundle is not None
     }
 
+@app.get("/cache/stats", response_model=CacheStatsResponse, tags=["Health"])
+async def cache_stats():
+    """Prediction cache occupancy and hit/miss/eviction counters since the model was loaded."""
+    if bundle is None or bundle.prediction_cache is None:
+        return CacheStatsResponse(enabled=False)
+    return CacheStatsResponse(enabled=True, **bundle.prediction_cache.stats())
+
+@app.get("/metrics", tags=["Health"])
+async def metrics_endpoint():
+    """Request, stage timing, error and cache metrics in the Prometheus text format."""
+    INFERENCE_PENDING.set(inference_pool.pending)
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.post("/admin/reload", response_model=ReloadResponse, tags=["Admin"])
+async def reload_endpoint(x_admin_token: Optional[str] = Header(None)):
+    """
+    Reload the model artifacts from disk without dropping requests.
+    
+    Requires FLIGHT_DELAY_ADMIN_TOKEN to be set and sent in the X-Admin-Token header.
+    
+    Returns:
+        ReloadResponse with the fingerprint and load time of the new model
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Set FLIGHT_DELAY_ADMIN_TOKEN to enable admin endpoints")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+    if reload_in_progress:
+        raise HTTPException(status_code=409, detail="A model reload is already in progress")
+    
+    try:
+        new_bundle = await reload_model()
+    except Exception as e:
+        logger.error(f"Model reload failed: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Reload failed, still serving the previous model: {str(e)}"
+        )
+    
+    return ReloadResponse(
+        status="reloaded",
+        fingerprint=new_bundle.fingerprint,
+        loaded_at=datetime.fromtimestamp(new_bundle.loaded_at, timezone.utc).isoformat(timespec='seconds')
+    )
+
 @app.post("/predict", response_model=PredictionResponse, tags=["Predictions"])
 async def predict_delay(request: PredictionRequest):
     """
@@ -146,72 +631,183 @@ async def predict_delay(request: PredictionRequest):
     Returns:
         PredictionResponse with delay probability, confidence, and prediction
     """
-    if model is None:
+    current = bundle
+    if current is None:
         raise HTTPException(status_code=500, detail="Model not loaded")
     
     try:
-        # Validate airport IDs exist
-        if request.origin_airport_id not in airports_df['AirportID'].values:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid origin_airport_id: {request.origin_airport_id}"
-            )
+        with VALIDATION_SECONDS.time(endpoint='/predict'):
+            # Validate airport IDs exist
+            if request.origin_airport_id not in current.airport_index:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid origin_airport_id: {request.origin_airport_id}"
+                )
+            
+            if request.dest_airport_id not in current.airport_index:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid dest_airport_id: {request.dest_airport_id}"
+                )
+            
+            if request.carrier is not None and request.carrier not in current.feature_builder.codes['Carrier']:
+                raise HTTPException(status_code=400, detail=f"Unknown carrier: {request.carrier}")
         
-        if request.dest_airport_id not in airports_df['AirportID'].values:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid dest_airport_id: {request.dest_airport_id}"
+        with FEATURE_BUILD_SECONDS.time(step='encode'):
+            values = request_features(current.feature_builder, [request])
+        
+        # One forest pass (or table lookup); label and confidence derive from it
+        probabilities = await score_one(current, values)
+        response = format_prediction(probabilities, current.model.classes_)
+        
+        # Sampled at INFO; otherwise the message is only built when DEBUG is enabled
+        sampled = PREDICTION_LOG_SAMPLE_RATE > 0 and random.random() < PREDICTION_LOG_SAMPLE_RATE
+        if sampled or logger.isEnabledFor(logging.DEBUG):
+            logger.log(
+                logging.INFO if sampled else logging.DEBUG,
+                f"Prediction: day={request.day_of_week}, "
+                f"origin={request.origin_airport_id}, dest={request.dest_airport_id}, "
+                f"prob={response.delay_probability:.4f}, result={response.prediction}"
             )
         
-        # Create input data with default values for features not provided
-        # Using typical values based on the dataset
-        input_data = pd.DataFrame({
-            'Month': [6],  # Mid-year default
-            'DayofMonth': [15],  # Mid-month default
-            'DayOfWeek': [request.day_of_week],
-            'OriginAirportID': [request.origin_airport_id],
-            'DestAirportID': [request.dest_airport_id],
-            'CRSDepTime_Hour': [12],  # Noon default
-            'CRSArrTime_Hour': [14],  # 2 PM default
-            'Carrier': [0]  # Default encoded carrier
-        })
+        return response
         
-        # Make prediction
-        probability = model.predict_proba(input_data)[0, 1]
-        prediction = model.predict(input_data)[0]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Prediction error: {e}")
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse, tags=["Predictions"])
+async def predict_delay_batch(request: BatchPredictionRequest):
+    """
+    Predict delay probabilities for several routes or days in a single call.
+    
+    Args:
+        request: BatchPredictionRequest containing up to MAX_BATCH_SIZE prediction requests
+    
+    Returns:
+        BatchPredictionResponse with one prediction per request, in the same order
+    """
+    current = bundle
+    if current is None:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    
+    try:
+        with FEATURE_BUILD_SECONDS.time(step='encode'):
+            values = request_features(current.feature_builder, request.predictions)
         
-        # Calculate confidence (using the max probability as a proxy for confidence)
-        confidence = max(model.predict_proba(input_data)[0])
+        with VALIDATION_SECONDS.time(endpoint='/predict/batch'):
+            # Validate all airport IDs together
+            for field, column in (('origin_airport_id', 'OriginAirportID'), ('dest_airport_id', 'DestAirportID')):
+                ids = values[column]
+                invalid = [
+                    i for i, airport_id in enumerate(ids.tolist())
+                    if airport_id not in current.airport_index
+                ]
+                if invalid:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Invalid {field} at index {invalid[0]}: {ids[invalid[0]]}"
+                    )
         
-        # Determine prediction text
-        prediction_text = "LIKELY DELAYED" if prediction == 1 else "LIKELY ON TIME"
+            carrier_codes = current.feature_builder.codes['Carrier']
+            invalid = [
+                i for i, p in enumerate(request.predictions)
+                if p.carrier is not None and p.carrier not in carrier_codes
+            ]
+            if invalid:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unknown carrier at index {invalid[0]}: {request.predictions[invalid[0]].carrier}"
+                )
         
-        logger.info(
-            f"Prediction: day={request.day_of_week}, "
-            f"origin={request.origin_airport_id}, dest={request.dest_airport_id}, "
-            f"prob={probability:.4f}, result={prediction_text}"
-        )
+        probabilities = await score(current, values)
         
-        return PredictionResponse(
-            delay_probability=float(probability),
-            confidence=float(confidence),
-            prediction=prediction_text
+        logger.debug(f"Batch prediction: {len(request.predictions)} routes")
+        
+        return BatchPredictionResponse(
+            predictions=[format_prediction(row, current.model.classes_) for row in probabilities]
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Prediction error: {e}")
+        logger.error(f"Batch prediction error: {e}")
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+@app.get("/heatmap", response_model=HeatmapResponse, tags=["Predictions"])
+async def get_heatmap(
+    origin_airport_id: Optional[int] = None,
+    dest_airport_id: Optional[int] = None,
+    day_of_week: Optional[int] = None,
+    limit: int = 100
+):
+    """
+    Rank routes by delay probability, with features other than the route and
+    day at their defaults.
+    
+    Served from a precomputed, quantized tensor, so a whole-network query is
+    an array slice. For example, all destinations from one origin:
+    ?origin_airport_id=13930, or the 10 riskiest routes on Fridays:
+    ?day_of_week=5&limit=10.
+    
+    Args:
+        origin_airport_id: Only routes from this airport
+        dest_airport_id: Only routes to this airport
+        day_of_week: Only this day (1=Monday, 7=Sunday)
+        limit: Maximum number of routes to return (default: 100)
+    
+    Returns:
+        HeatmapResponse with the number of matching routes and the riskiest ones
+    """
+    current = bundle
+    if current is None or current.delay_heatmap is None:
+        raise HTTPException(status_code=500, detail="Delay heatmap not loaded")
+    
+    try:
+        # Validate parameters
+        if limit < 1 or limit > MAX_HEATMAP_ROUTES:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_HEATMAP_ROUTES}")
+        
+        if day_of_week is not None and not 1 <= day_of_week <= 7:
+            raise HTTPException(status_code=400, detail="day_of_week must be between 1 and 7")
+        
+        for field, airport_id in (('origin_airport_id', origin_airport_id), ('dest_airport_id', dest_airport_id)):
+            if airport_id is not None and airport_id not in current.delay_heatmap.airport_positions:
+                raise HTTPException(status_code=400, detail=f"Invalid {field}: {airport_id}")
+        
+        total, routes = current.delay_heatmap.query(origin_airport_id, dest_airport_id, day_of_week, limit)
+        
+        return HeatmapResponse(
+            total=total,
+            routes=[
+                HeatmapRoute(
+                    origin_airport_id=origin, dest_airport_id=dest,
+                    day_of_week=day, delay_probability=probability
+                )
+                for origin, dest, day, probability in routes
+            ]
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Heatmap error: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to query heatmap: {str(e)}")
+
 @app.get("/airports", response_model=AirportsResponse, tags=["Airports"])
 async def get_airports(
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     Get a list of all airports sorted alphabetically by name.
     
+    Pages are served from JSON serialized at startup, with a strong ETag and
+    Cache-Control so clients can revalidate with If-None-Match and get a 304.
+    
     Args:
         limit: Maximum number of airports to return (default: 100)
         offset: Number of airports to skip for pagination (default: 0)
@@ -219,8 +815,9 @@ async def get_airports(
     Returns:
         AirportsResponse with total count and list of airports
     """
-    if airports_df is None:
+    if bundle is None:
         raise HTTPException(status_code=500, detail="Airports data not loaded")
+    serialized_airports = bundle.serialized_airports
     
     try:
         # Validate parameters
@@ -230,28 +827,20 @@ async def get_airports(
         if offset < 0:
             raise HTTPException(status_code=400, detail="offset must be non-negative")
         
-        # Get total count
-        total = len(airports_df)
-        
-        # Apply pagination
-        paginated_df = airports_df.iloc[offset:offset + limit]
+        headers = {
+            "ETag": serialized_airports.etag(offset, limit),
+            "Cache-Control": f"public, max-age={AIRPORTS_CACHE_MAX_AGE}"
+        }
         
-        # Convert to response format
-        airports_list = [
-            Airport(
-                airport_id=int(row['AirportID']),
-                airport_name=str(row['AirportName']),
-                city=str(row['City']),
-                state=str(row['State'])
-            )
-            for _, row in paginated_df.iterrows()
-        ]
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
         
-        logger.info(f"Returning {len(airports_list)} airports (offset={offset}, limit={limit})")
+        logger.debug(f"Returning airports (offset={offset}, limit={limit})")
         
-        return AirportsResponse(
-            total=total,
-            airports=airports_list
+        return Response(
+            content=serialized_airports.page(offset, limit),
+            media_type="application/json",
+            headers=headers
         )
         
     except HTTPException:
@@ -260,6 +849,50 @@ async def get_airports(
         logger.error(f"Error fetching airports: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch airports: {str(e)}")
 
+@app.get("/airports/search", response_model=AirportsResponse, tags=["Airports"])
+async def search_airports(q: str, limit: int = 10):
+    """
+    Find airports by the start of their name, city, or any word in them,
+    or by state or airport ID, for typeahead fields.
+    
+    Matches come from a prefix index built at startup: airports whose name
+    starts with the query first, then city, state and ID matches, then
+    matches on other words, each group sorted by name.
+    
+    Args:
+        q: Search text, e.g. "san" or "chicago o'h" (case and punctuation are ignored)
+        limit: Maximum number of airports to return (default: 10)
+    
+    Returns:
+        AirportsResponse with the number of matching airports and the best matches
+    """
+    current = bundle
+    if current is None:
+        raise HTTPException(status_code=500, detail="Airports data not loaded")
+    
+    try:
+        # Validate parameters
+        if limit < 1 or limit > MAX_SEARCH_RESULTS:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_SEARCH_RESULTS}")
+        
+        if not q.strip():
+            raise HTTPException(status_code=400, detail="q must not be empty")
+        
+        total, positions = current.airport_search.search(q, limit)
+        logger.debug(f"Airport search {q!r}: {total} matches")
+        
+        return Response(
+            content=current.serialized_airports.matches(total, positions),
+            media_type="application/json",
+            headers={"Cache-Control": f"public, max-age={AIRPORTS_CACHE_MAX_AGE}"}
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching airports: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to search airports: {str(e)}")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
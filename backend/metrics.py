@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Metrics
+=======
+
+Counters, gauges and histograms rendered in the Prometheus text exposition
+format, without depending on prometheus_client. Observations are a dict
+update and a bisect under a lock, so they are cheap enough for every request
+and safe to record from inference threads.
+
+MetricsMiddleware records request latency, status codes and errors per route
+template (e.g. /predict), keeping label cardinality bounded.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from table lookups up to slow batch scoring
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items(), key=lambda item: tuple(map(str, item[0])))
+            lines.extend(self._samples(items))
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self, items):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count of observations."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # One slot per bucket plus +Inf, then the sum
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self, items):
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state[:-1]):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Creates metrics and renders them all for a /metrics endpoint."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text format."""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status codes and errors per route template."""
+
+    def __init__(self, app, latency, requests, errors):
+        """
+        Args:
+            app: ASGI application to wrap
+            latency: Histogram with 'method' and 'endpoint' labels
+            requests: Counter with 'method', 'endpoint' and 'status' labels
+            errors: Counter with the same labels, for 4xx and 5xx responses only
+        """
+        self.app = app
+        self.latency = latency
+        self.requests = requests
+        self.errors = errors
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The router stores the matched route in the scope; unmatched paths share one label
+            route = scope.get('route')
+            endpoint = getattr(route, 'path', 'unmatched')
+            self.latency.observe(time.perf_counter() - start, method=scope['method'], endpoint=endpoint)
+            labels = {'method': scope['method'], 'endpoint': endpoint, 'status': str(status)}
+            self.requests.inc(**labels)
+            if status >= 400:
+                self.errors.inc(**labels)
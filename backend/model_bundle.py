@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Model Bundle
+============
+
+Everything one version of the model artifacts needs to serve requests: the
+model, encoders, feature columns, airport index and the structures derived
+from them. A bundle is built completely before the API publishes it by
+replacing a single reference, and it is never modified afterwards.
+
+A request reads that reference once and uses the same bundle to the end, so
+a reload never mixes artifacts from two model versions, and requests already
+in flight finish on the bundle they started with.
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from airport_index import AIRPORTS_BINARY, AIRPORTS_CSV
+from flight_features import LABEL_CLASSES, LABEL_ENCODERS
+from forest_engine import MODEL_ARRAYS, MODEL_INFO, MODEL_PICKLE
+from prediction_table import artifact_fingerprint
+
+# Files written by create_model.py; changes to any of them trigger a reload
+ARTIFACT_FILES = (
+    MODEL_PICKLE,
+    os.path.join(MODEL_ARRAYS, 'manifest.json'),
+    MODEL_INFO,
+    LABEL_ENCODERS,
+    LABEL_CLASSES,
+    'feature_columns.json',
+    AIRPORTS_CSV,
+    AIRPORTS_BINARY,
+)
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """One loaded, validated set of model artifacts."""
+
+    model: Any
+    label_classes: dict
+    feature_columns: List[str]
+    feature_builder: Any
+    airport_index: Any
+    serialized_airports: Any
+    airport_search: Any
+    fingerprint: str
+    loaded_at: float
+    prediction_table: Optional[Any] = None
+    delay_heatmap: Optional[Any] = None
+    prediction_cache: Optional[Any] = None
+    prediction_batcher: Optional[Any] = None
+
+
+def artifacts_fingerprint(models_dir):
+    """Fingerprint of the model artifacts currently on disk."""
+    paths = [os.path.join(models_dir, name) for name in ARTIFACT_FILES]
+    return artifact_fingerprint([path for path in paths if os.path.exists(path)], {})
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Prediction Batcher
+==================
+
+Coalesces concurrent single-flight predictions into one model call. The first
+request to arrive opens a window of max_wait_ms; everything that arrives
+before it closes, up to max_batch_size requests, is scored together and the
+rows are handed back to the waiting coroutines.
+
+The model's fixed per-call overhead is then paid once per batch instead of
+once per request, while the extra latency any request sees is bounded by the
+window.
+"""
+
+import asyncio
+
+
+class PredictionBatcher:
+    """Collects single feature-row requests and scores them in batches."""
+
+    def __init__(self, score, max_batch_size, max_wait_ms):
+        """
+        Args:
+            score: Coroutine function taking a list of feature rows and
+                returning one probability row per feature row
+            max_batch_size: Requests that close the window early
+            max_wait_ms: Longest a request waits for others to join its batch
+        """
+        self.score = score
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.requests = 0
+        self._pending = []
+        self._timer = None
+
+    async def predict(self, row):
+        """Probability row for one feature row, scored together with concurrent requests."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Close the current window and score its requests in the background."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._score_batch(batch))
+
+    async def _score_batch(self, batch):
+        rows, futures = zip(*batch)
+        self.batches += 1
+        self.requests += len(batch)
+        try:
+            probabilities = await self.score(list(rows))
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for future, row in zip(futures, probabilities):
+            # A client that disconnected leaves a cancelled future behind
+            if not future.done():
+                future.set_result(row)
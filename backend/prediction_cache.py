@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Prediction Cache
+================
+
+Bounded in-process cache of prediction results, keyed on the complete feature
+row the model scores. Least recently used entries are evicted once the cache
+is full, and entries can optionally expire after a fixed time to live.
+
+Keying on every feature, not just the request fields, keeps the cache correct
+when defaults change or more inputs are exposed. The API creates a fresh cache
+whenever the model is loaded, so results from an old model are never served.
+"""
+
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """LRU cache with optional TTL and hit/miss/eviction counters."""
+
+    def __init__(self, max_size, ttl_seconds=None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        # key -> (expiry time or None, value), oldest first
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Cached value for key, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Store value for key, evicting the least recently used entry if full."""
+        expires_at = None if self.ttl_seconds is None else time.monotonic() + self.ttl_seconds
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        """Counters and occupancy as a dict."""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Precomputed Prediction Table
+============================
+
+The /predict endpoint only exposes day of week, origin and destination; every
+other model feature is pinned to a fixed default. That makes the whole input
+space small enough to score once and serve from a dense NumPy array.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+from forest_engine import takes_arrays
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the on-disk layout of the table changes
+TABLE_VERSION = 1
+
+DAYS_OF_WEEK = 7
+
+
+class PredictionTable:
+    """Class probabilities indexed by [day_of_week - 1, origin_pos, dest_pos]."""
+
+    def __init__(self, airport_ids, probabilities, classes):
+        self.airport_ids = np.asarray(airport_ids)
+        self.probabilities = probabilities
+        self.classes = np.asarray(classes)
+        self.airport_positions = {int(a): i for i, a in enumerate(self.airport_ids)}
+
+    def lookup(self, day_of_week, origin_airport_id, dest_airport_id):
+        """Return the class probability row for a route, or None if it is not in the table."""
+        origin_pos = self.airport_positions.get(origin_airport_id)
+        dest_pos = self.airport_positions.get(dest_airport_id)
+        if origin_pos is None or dest_pos is None or not 1 <= day_of_week <= DAYS_OF_WEEK:
+            return None
+        return self.probabilities[day_of_week - 1, origin_pos, dest_pos]
+
+    def lookup_many(self, days_of_week, origin_airport_ids, dest_airport_ids):
+        """Return class probabilities for many routes at once; all IDs must be in the table."""
+        origin_pos = np.fromiter(
+            (self.airport_positions[int(a)] for a in origin_airport_ids), dtype=np.intp
+        )
+        dest_pos = np.fromiter(
+            (self.airport_positions[int(a)] for a in dest_airport_ids), dtype=np.intp
+        )
+        days = np.asarray(days_of_week, dtype=np.intp) - 1
+        return self.probabilities[days, origin_pos, dest_pos]
+
+
+def build_prediction_table(model, feature_columns, airport_ids, fixed_features):
+    """Score every (day, origin, dest) combination in a single predict_proba call."""
+    airport_ids = np.asarray(airport_ids)
+    n_airports = len(airport_ids)
+
+    days, origins, dests = np.meshgrid(
+        np.arange(1, DAYS_OF_WEEK + 1), airport_ids, airport_ids, indexing='ij'
+    )
+    n_rows = days.size
+
+    columns = {name: np.full(n_rows, value) for name, value in fixed_features.items()}
+    columns['DayOfWeek'] = days.ravel()
+    columns['OriginAirportID'] = origins.ravel()
+    columns['DestAirportID'] = dests.ravel()
+    if takes_arrays(model):
+        input_data = np.column_stack([columns[name] for name in feature_columns])
+    else:
+        import pandas as pd
+        input_data = pd.DataFrame(columns)[feature_columns]
+
+    probabilities = model.predict_proba(input_data)
+    probabilities = probabilities.reshape(DAYS_OF_WEEK, n_airports, n_airports, -1)
+
+    return PredictionTable(airport_ids, probabilities, model.classes_)
+
+
+def artifact_fingerprint(paths, fixed_features):
+    """Cheap fingerprint of the model artifacts, based on file size and modification time."""
+    digest = hashlib.sha256(str(TABLE_VERSION).encode())
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    digest.update(json.dumps(fixed_features, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def load_or_build_prediction_table(model, feature_columns, airport_ids, fixed_features,
+                                   cache_path, fingerprint):
+    """
+    Load the table from cache_path if it was built from the same artifacts,
+    otherwise rebuild it from the model and refresh the cache.
+
+    Returns:
+        PredictionTable
+    """
+    airport_ids = np.asarray(airport_ids)
+
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as cached:
+                if (str(cached['fingerprint']) == fingerprint
+                        and np.array_equal(cached['airport_ids'], airport_ids)):
+                    logger.info(f"Loaded prediction table from {cache_path}")
+                    return PredictionTable(
+                        cached['airport_ids'], cached['probabilities'], cached['classes']
+                    )
+            logger.info("Model artifacts changed, rebuilding prediction table")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable prediction table cache: {e}")
+
+    table = build_prediction_table(model, feature_columns, airport_ids, fixed_features)
+    logger.info(f"Built prediction table with shape {table.probabilities.shape}")
+
+    try:
+        tmp_path = cache_path + '.tmp.npz'
+        np.savez(
+            tmp_path,
+            fingerprint=np.array(fingerprint),
+            airport_ids=table.airport_ids,
+            probabilities=table.probabilities,
+            classes=table.classes,
+        )
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not write prediction table cache: {e}")
+
+    return table
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Process Memory
+==============
+
+Resident memory of a process, split into what it shares with other processes
+and what it holds privately, read from /proc/<pid>/smaps_rollup (Linux 4.14+).
+
+PSS (proportional set size) charges each shared page to the processes mapping
+it in equal parts, so summing PSS over a parent and its forked workers gives
+their real combined footprint, unlike summing RSS.
+"""
+
+# smaps_rollup fields, in kB, and the keys they are reported under
+SMAPS_FIELDS = {
+    'Rss': 'rss',
+    'Pss': 'pss',
+    'Shared_Clean': 'shared',
+    'Shared_Dirty': 'shared',
+    'Private_Clean': 'private',
+    'Private_Dirty': 'private',
+}
+
+
+def memory_usage(pid='self'):
+    """
+    Memory of a process in bytes.
+
+    Returns:
+        Dict with rss, pss, shared and private bytes, or None where
+        /proc/<pid>/smaps_rollup is not available
+    """
+    usage = dict.fromkeys(SMAPS_FIELDS.values(), 0)
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in SMAPS_FIELDS:
+                    usage[SMAPS_FIELDS[name]] += int(value.split()[0]) * 1024
+    except OSError:
+        return None
+    return usage
+
+
+def format_usage(usage):
+    """One-line summary of memory_usage() in MB."""
+    if usage is None:
+        return "memory usage unavailable"
+    return ", ".join(f"{key} {value / 2**20:,.1f} MB" for key, value in usage.items())
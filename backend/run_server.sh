@@ -22,6 +22,13 @@ if [ ! -f "$PYTHON_ENV" ]; then
     exit 1
 fi
 
-# Run uvicorn using the virtual environment's Python
 cd "$SCRIPT_DIR"
+
+# FLIGHT_DELAY_WORKERS > 1 forks that many workers sharing one preloaded model
+WORKERS="${FLIGHT_DELAY_WORKERS:-1}"
+if [ "$WORKERS" -gt 1 ]; then
+    exec "$PYTHON_ENV" serve.py --host 0.0.0.0 --port 8000 --workers "$WORKERS"
+fi
+
+# Run uvicorn using the virtual environment's Python
 "$PYTHON_ENV" -m uvicorn main:app --reload --host 0.0.0.0 --port 8000
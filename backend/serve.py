@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Multi-worker Server
+===================
+
+Serves the API from several processes that share one copy of the model.
+
+The model bundle is loaded once in this parent process, then the listening
+socket is opened and worker processes are forked. Each worker inherits the
+forest, encoders, prediction table and airport index copy-on-write, so their
+pages stay shared as long as nobody writes to them (the compiled engine's
+memory-mapped arrays are shared through the page cache in any case). The
+kernel spreads incoming connections across the workers, which run uvicorn on
+the inherited socket.
+
+Once every worker is up, a report lists the resident, shared and
+proportional (PSS) memory of each process.
+
+A worker that exits unexpectedly is replaced by a fresh fork of the parent.
+Hot reloads (FLIGHT_DELAY_MODEL_WATCH_SECONDS or /admin/reload) happen per
+worker and give that worker a private copy of the new model; restart the
+server to share it again.
+
+Usage:
+    python serve.py --workers 4
+    python serve.py --host 127.0.0.1 --port 8080 --workers 8
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import select
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+import main as api
+from process_memory import format_usage, memory_usage
+
+# How long to wait for workers to start before reporting anyway
+READY_TIMEOUT_SECONDS = 60
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Serve the Flight Delay Prediction API from several workers.")
+    parser.add_argument('--host', default='0.0.0.0', help="Address to bind (default: 0.0.0.0)")
+    parser.add_argument('--port', type=int, default=8000, help="Port to bind (default: 8000)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument('--log-level', default='info', help="uvicorn log level (default: info)")
+    return parser.parse_args()
+
+
+def bind_socket(host, port):
+    """Listening socket shared by every worker."""
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock, args, ready_fd):
+    """Serve requests on the inherited socket until told to stop. Runs in the forked child."""
+    config = uvicorn.Config(api.app, log_level=args.log_level)
+    server = uvicorn.Server(config)
+
+    async def serve():
+        task = asyncio.ensure_future(server.serve(sockets=[sock]))
+        while not server.started and not task.done():
+            await asyncio.sleep(0.05)
+        if server.started:
+            os.write(ready_fd, b'.')
+        await task
+
+    asyncio.run(serve())
+
+
+def fork_worker(sock, args, ready_fd):
+    """Start one worker process and return its pid."""
+    pid = os.fork()
+    if pid == 0:
+        # Termination is handled by uvicorn inside the worker
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        code = 0
+        try:
+            run_worker(sock, args, ready_fd)
+        except BaseException as e:
+            print(f"Worker {os.getpid()} failed: {e}", file=sys.stderr)
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def wait_until_ready(ready_fd, workers):
+    """Block until every worker has started, or READY_TIMEOUT_SECONDS pass."""
+    ready = 0
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    while ready < workers:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([ready_fd], [], [], remaining)[0]:
+            break
+        ready += len(os.read(ready_fd, workers - ready))
+    return ready
+
+
+def print_memory_report(worker_pids):
+    """Per-process memory, and the combined footprint of parent and workers."""
+    print("\nMemory report")
+    print("=" * 50)
+    total_pss = 0
+    for label, pid in [('parent', os.getpid())] + [('worker', p) for p in worker_pids]:
+        usage = memory_usage(pid)
+        total_pss += usage['pss'] if usage else 0
+        print(f"  {label:<7} {pid:>7}: {format_usage(usage)}")
+    if total_pss:
+        print(f"  Combined PSS of {len(worker_pids) + 1} processes: {total_pss / 2**20:,.1f} MB")
+    sys.stdout.flush()
+
+
+def main():
+    """Load the model, fork the workers and supervise them."""
+    args = parse_args()
+    if args.workers < 1:
+        sys.exit("--workers must be at least 1")
+
+    print("Flight Delay Prediction API - Multi-worker Server")
+    print("=" * 50)
+
+    api.preload_model()
+    # Objects that survive to the fork are never collected, so the garbage
+    # collector does not write to (and privately copy) their pages in the workers
+    gc.collect()
+    gc.freeze()
+
+    sock = bind_socket(args.host, args.port)
+    ready_r, ready_w = os.pipe()
+    workers = set()
+    for _ in range(args.workers):
+        workers.add(fork_worker(sock, args, ready_w))
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    ready = wait_until_ready(ready_r, args.workers)
+    print(f"\n{ready} of {args.workers} workers serving on http://{args.host}:{args.port}")
+    print_memory_report(sorted(workers))
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, starting a replacement")
+            time.sleep(1)
+            workers.add(fork_worker(sock, args, ready_w))
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -42,6 +42,21 @@ def test_airports():
         print(f"  ✗ Error: {e}")
         return False
 
+def test_airport_search():
+    """Test the airport search endpoint."""
+    print("\nTesting /airports/search endpoint...")
+    try:
+        response = requests.get(f"{BASE_URL}/airports/search", params={'q': 'san', 'limit': 5}, timeout=5)
+        response.raise_for_status()
+        data = response.json()
+        print(f"  ✓ Matches for 'san': {data['total']}")
+        if data['airports']:
+            print(f"  ✓ Best match: {data['airports'][0]['airport_name']}")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
 def test_prediction():
     """Test the prediction endpoint."""
     print("\nTesting /predict endpoint...")
@@ -110,6 +125,7 @@ def main():
     results = []
     results.append(("Health Check", test_health()))
     results.append(("Airports List", test_airports()))
+    results.append(("Airport Search", test_airport_search()))
     results.append(("Prediction", test_prediction()))
     results.append(("Invalid Input Handling", test_invalid_prediction()))
     
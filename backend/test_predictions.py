@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Prediction regression tests for the Flight Delay Prediction API
+===============================================================
+
+Runs the prediction endpoints in-process and checks that every airport pair
+and day of week produces exactly the response of the original implementation,
+which scored each request with separate predict_proba/predict/predict_proba
+passes.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+
+import httpx
+import joblib
+import numpy as np
+import pandas as pd
+
+import main as api
+from inference_pool import InferencePool
+
+BATCH_CHUNK_SIZE = api.MAX_BATCH_SIZE
+
+logging.getLogger(api.__name__).setLevel(logging.WARNING)
+
+def legacy_responses(days, origins, dests):
+    """Reference responses computed the way predict_delay originally did."""
+    input_data = pd.DataFrame({
+        'Month': np.full(len(days), api.DEFAULT_FEATURES['Month']),
+        'DayofMonth': np.full(len(days), api.DEFAULT_FEATURES['DayofMonth']),
+        'DayOfWeek': days,
+        'OriginAirportID': origins,
+        'DestAirportID': dests,
+        'CRSDepTime_Hour': np.full(len(days), api.DEFAULT_FEATURES['CRSDepTime_Hour']),
+        'CRSArrTime_Hour': np.full(len(days), api.DEFAULT_FEATURES['CRSArrTime_Hour']),
+        'Carrier': np.full(len(days), api.DEFAULT_FEATURES['Carrier'])
+    })
+    probability = api.bundle.model.predict_proba(input_data)[:, 1]
+    prediction = api.bundle.model.predict(input_data)
+    confidence = api.bundle.model.predict_proba(input_data).max(axis=1)
+    return [
+        {
+            'delay_probability': float(p),
+            'confidence': float(c),
+            'prediction': "LIKELY DELAYED" if label == 1 else "LIKELY ON TIME"
+        }
+        for p, label, c in zip(probability, prediction, confidence)
+    ]
+
+def flight_fields(n_rows):
+    """Varied values for the optional request fields, one set per row."""
+    carriers = api.bundle.label_classes['Carrier']
+    rows = np.arange(n_rows)
+    return {
+        'month': rows % 12 + 1,
+        'day_of_month': rows % 28 + 1,
+        'departure_hour': rows % 24,
+        'arrival_hour': (rows + 3) % 24,
+        'carrier': [carriers[i % len(carriers)] for i in rows]
+    }
+
+def label_encoders():
+    """The fitted LabelEncoders saved with the model."""
+    return joblib.load(os.path.join(api.MODELS_DIR, 'label_encoders.pkl'))
+
+def legacy_flight_responses(days, origins, dests, fields):
+    """Reference responses for flights with optional fields, encoded with LabelEncoder.transform."""
+    input_data = pd.DataFrame({
+        'Month': fields['month'],
+        'DayofMonth': fields['day_of_month'],
+        'DayOfWeek': days,
+        'OriginAirportID': origins,
+        'DestAirportID': dests,
+        'CRSDepTime_Hour': fields['departure_hour'],
+        'CRSArrTime_Hour': fields['arrival_hour'],
+        'Carrier': label_encoders()['Carrier'].transform(fields['carrier'])
+    })
+    probabilities = api.bundle.model.predict_proba(input_data)
+    return [
+        {
+            'delay_probability': float(row[1]),
+            'confidence': float(row.max()),
+            'prediction': "LIKELY DELAYED" if row.argmax() == 1 else "LIKELY ON TIME"
+        }
+        for row in probabilities
+    ]
+
+def flight_requests(days, origins, dests, fields):
+    """PredictionRequests with every optional field set."""
+    return [
+        api.PredictionRequest(
+            day_of_week=int(days[i]), origin_airport_id=int(origins[i]), dest_airport_id=int(dests[i]),
+            month=int(fields['month'][i]), day_of_month=int(fields['day_of_month'][i]),
+            departure_hour=int(fields['departure_hour'][i]), arrival_hour=int(fields['arrival_hour'][i]),
+            carrier=fields['carrier'][i].lower()
+        )
+        for i in range(len(days))
+    ]
+
+def all_routes():
+    """Every (day, origin, dest) combination the API accepts."""
+    airport_ids = api.bundle.airport_index.ids_by_name
+    days, origins, dests = np.meshgrid(np.arange(1, 8), airport_ids, airport_ids, indexing='ij')
+    return days.ravel(), origins.ravel(), dests.ravel()
+
+def count_mismatches(responses, expected):
+    """Number of responses that differ from the reference."""
+    return sum(1 for got, want in zip(responses, expected) if got.model_dump() != want)
+
+def predict_each(days, origins, dests):
+    """Call the /predict handler once per route."""
+    async def run():
+        return [
+            await api.predict_delay(api.PredictionRequest(
+                day_of_week=int(d), origin_airport_id=int(o), dest_airport_id=int(t)
+            ))
+            for d, o, t in zip(days, origins, dests)
+        ]
+    return asyncio.run(run())
+
+def load(use_prediction_table, batch_wait_ms=0):
+    """(Re)load the model with or without the precomputed prediction table."""
+    api.USE_PREDICTION_TABLE = use_prediction_table
+    api.BATCH_WAIT_MS = batch_wait_ms
+    asyncio.run(api.load_model())
+
+def sample_routes():
+    """Routes spread over every origin, destination and day."""
+    days, origins, dests = all_routes()
+    sample = np.arange(0, len(days), len(api.bundle.airport_index) + 1)
+    return days[sample], origins[sample], dests[sample]
+
+def test_single_predictions_with_table():
+    """Test /predict for every route, served from the prediction table."""
+    print("Testing /predict (prediction table) against legacy output...")
+    load(use_prediction_table=True)
+    days, origins, dests = all_routes()
+    expected = legacy_responses(days, origins, dests)
+
+    mismatches = count_mismatches(predict_each(days, origins, dests), expected)
+    assert mismatches == 0, f"{mismatches} of {len(expected)} routes differ from the legacy output"
+    print(f"  ✓ {len(expected)} routes match")
+
+def test_single_predictions_with_model():
+    """Test /predict scored by the model on a sample of routes."""
+    print("\nTesting /predict (model) against legacy output...")
+    load(use_prediction_table=False)
+    days, origins, dests = sample_routes()
+    expected = legacy_responses(days, origins, dests)
+
+    mismatches = count_mismatches(predict_each(days, origins, dests), expected)
+    assert mismatches == 0, f"{mismatches} of {len(expected)} routes differ from the legacy output"
+    print(f"  ✓ {len(expected)} routes match")
+
+def test_batch_predictions_with_model():
+    """Test /predict/batch scored by the model for every route."""
+    print("\nTesting /predict/batch (model) against legacy output...")
+    load(use_prediction_table=False)
+    days, origins, dests = all_routes()
+    expected = legacy_responses(days, origins, dests)
+
+    async def run():
+        responses = []
+        for start in range(0, len(days), BATCH_CHUNK_SIZE):
+            chunk = slice(start, start + BATCH_CHUNK_SIZE)
+            batch = api.BatchPredictionRequest(predictions=[
+                api.PredictionRequest(
+                    day_of_week=int(d), origin_airport_id=int(o), dest_airport_id=int(t)
+                )
+                for d, o, t in zip(days[chunk], origins[chunk], dests[chunk])
+            ])
+            responses.extend((await api.predict_delay_batch(batch)).predictions)
+        return responses
+
+    mismatches = count_mismatches(asyncio.run(run()), expected)
+    assert mismatches == 0, f"{mismatches} of {len(expected)} routes differ from the legacy output"
+    print(f"  ✓ {len(expected)} routes match")
+
+def test_cached_single_predictions():
+    """Test repeated /predict calls served from the prediction cache."""
+    print("\nTesting /predict (cached model results) against legacy output...")
+    load(use_prediction_table=False)
+    days, origins, dests = sample_routes()
+    expected = legacy_responses(days, origins, dests)
+
+    first = count_mismatches(predict_each(days, origins, dests), expected)
+    repeated = count_mismatches(predict_each(days, origins, dests), expected)
+    stats = api.bundle.prediction_cache.stats()
+    assert first + repeated == 0, f"{first + repeated} of {2 * len(expected)} responses differ from the legacy output"
+    assert stats['hits'] == len(expected) and stats['misses'] == len(expected), \
+        f"expected {len(expected)} hits and misses, got {stats['hits']} hits and {stats['misses']} misses"
+    print(f"  ✓ {len(expected)} routes twice: {stats['hits']} hits, {stats['misses']} misses")
+
+    load(use_prediction_table=False)
+    assert api.bundle.prediction_cache.stats()['size'] == 0, "cache not emptied when the model is reloaded"
+    print("  ✓ Cache emptied when the model is reloaded")
+
+def test_coalesced_single_predictions():
+    """Test concurrent /predict calls coalesced into model batches."""
+    print("\nTesting /predict (micro-batched model) against legacy output...")
+    load(use_prediction_table=False, batch_wait_ms=5)
+    days, origins, dests = sample_routes()
+    expected = legacy_responses(days, origins, dests)
+
+    async def run():
+        return await asyncio.gather(*(
+            api.predict_delay(api.PredictionRequest(
+                day_of_week=int(d), origin_airport_id=int(o), dest_airport_id=int(t)
+            ))
+            for d, o, t in zip(days, origins, dests)
+        ))
+
+    mismatches = count_mismatches(asyncio.run(run()), expected)
+    batcher = api.bundle.prediction_batcher
+    assert mismatches == 0, f"{mismatches} of {len(expected)} routes differ from the legacy output"
+    assert batcher.batches < batcher.requests, f"{batcher.requests} requests were not coalesced"
+    print(f"  ✓ {len(expected)} routes match, scored in {batcher.batches} batches")
+
+def test_inference_pool_saturation():
+    """Test the 503 with Retry-After from a saturated pool, counting jobs whose request was cancelled."""
+    print("\nTesting /predict against a saturated inference pool...")
+    load(use_prediction_table=False)
+    origin, dest = api.bundle.airport_index.ids_by_name[:2]
+    route = {'day_of_week': 3, 'origin_airport_id': int(origin), 'dest_airport_id': int(dest)}
+    release = threading.Event()
+    pool, api.inference_pool = api.inference_pool, InferencePool(max_workers=1, max_queue=1)
+
+    async def run():
+        # One job running and one queued fill the pool
+        running = asyncio.ensure_future(api.inference_pool.run(release.wait))
+        queued = asyncio.ensure_future(api.inference_pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        # The client waiting on the running job gives up; its thread stays busy
+        running.cancel()
+        await asyncio.sleep(0.05)
+        pending = api.inference_pool.pending
+
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            rejected = await asyncio.wait_for(client.post("/predict", json=route), timeout=5)
+            release.set()
+            await queued
+            accepted = await client.post("/predict", json=route)
+        return pending, rejected, accepted
+
+    try:
+        pending, rejected, accepted = asyncio.run(run())
+    finally:
+        release.set()
+        api.inference_pool.shutdown()
+        pool, api.inference_pool = api.inference_pool, pool
+
+    assert pending == 2, f"{pending} jobs counted after cancelling a running one, expected 2"
+    assert rejected.status_code == 503, f"saturated pool returned {rejected.status_code}"
+    assert rejected.headers.get('retry-after') == str(api.RETRY_AFTER_SECONDS), "503 without Retry-After"
+    assert accepted.status_code == 200, f"drained pool returned {accepted.status_code}"
+    assert pool.pending == 0, f"{pool.pending} jobs still counted after the pool drained"
+    print(f"  ✓ 503 with Retry-After: {rejected.headers['retry-after']} while saturated, 200 once drained")
+
+def test_hot_reload():
+    """Test that /admin/reload swaps the model while predictions keep being served."""
+    print("\nTesting /admin/reload under load...")
+    # Batching keeps the concurrent requests within the inference queue limit
+    load(use_prediction_table=False, batch_wait_ms=5)
+    days, origins, dests = sample_routes()
+    expected = legacy_responses(days, origins, dests)
+    api.ADMIN_TOKEN = 'test-token'
+    old_bundle = api.bundle
+
+    async def run():
+        predictions = asyncio.gather(*(
+            api.predict_delay(api.PredictionRequest(
+                day_of_week=int(d), origin_airport_id=int(o), dest_airport_id=int(t)
+            ))
+            for d, o, t in zip(days, origins, dests)
+        ))
+        reload = await api.reload_endpoint(x_admin_token='test-token')
+        return await predictions, reload
+
+    responses, reload = asyncio.run(run())
+    mismatches = count_mismatches(responses, expected)
+    assert mismatches == 0, f"{mismatches} of {len(expected)} routes during reload differ from the legacy output"
+    assert api.bundle is not old_bundle and reload.fingerprint == old_bundle.fingerprint, "new bundle not published"
+    print(f"  ✓ {len(expected)} routes match during reload, new bundle published")
+
+    # A failed reload keeps serving the current bundle
+    current = api.bundle
+    models_dir, api.MODELS_DIR = api.MODELS_DIR, os.path.join(api.MODELS_DIR, 'missing')
+    try:
+        asyncio.run(api.reload_endpoint(x_admin_token='test-token'))
+        status = 200
+    except api.HTTPException as e:
+        status = e.status_code
+    finally:
+        api.MODELS_DIR = models_dir
+    assert status == 500, f"failed reload returned {status}"
+    assert api.bundle is current, "failed reload replaced the model"
+    print("  ✓ Failed reload keeps the previous model")
+
+def test_flight_features():
+    """Test /predict and /predict/batch with month, day, hours and carrier set."""
+    print("\nTesting optional flight fields against LabelEncoder-encoded model output...")
+    # The table only covers default features, so these must bypass it
+    load(use_prediction_table=True)
+    days, origins, dests = sample_routes()
+    fields = flight_fields(len(days))
+    expected = legacy_flight_responses(days, origins, dests, fields)
+    requests = flight_requests(days, origins, dests, fields)
+
+    async def run():
+        single = [await api.predict_delay(r) for r in requests]
+        batch = (await api.predict_delay_batch(api.BatchPredictionRequest(predictions=requests))).predictions
+        return single, batch
+
+    single, batch = asyncio.run(run())
+    mismatches = count_mismatches(single, expected) + count_mismatches(batch, expected)
+    assert mismatches == 0, f"{mismatches} of {2 * len(expected)} responses differ from the encoded model output"
+    print(f"  ✓ {len(expected)} flights match (single and batch)")
+
+    unknown = api.PredictionRequest(
+        day_of_week=1, origin_airport_id=int(origins[0]), dest_airport_id=int(dests[0]), carrier='??'
+    )
+    try:
+        asyncio.run(api.predict_delay(unknown))
+        status = 200
+    except api.HTTPException as e:
+        status = e.status_code
+    assert status == 400, f"unknown carrier returned {status}"
+    print("  ✓ Unknown carrier rejected with 400")
+
+def test_heatmap():
+    """Test /heatmap rankings against the legacy probabilities they quantize."""
+    print("\nTesting /heatmap against legacy output...")
+    load(use_prediction_table=False)
+    days, origins, dests = all_routes()
+    expected = {
+        (int(d), int(o), int(t)): r['delay_probability']
+        for d, o, t, r in zip(days, origins, dests, legacy_responses(days, origins, dests))
+        if o != t
+    }
+
+    response = asyncio.run(api.get_heatmap(limit=api.MAX_HEATMAP_ROUTES))
+    routes = response.routes
+    errors = [
+        abs(r.delay_probability - expected[(r.day_of_week, r.origin_airport_id, r.dest_airport_id)])
+        for r in routes
+    ]
+    assert response.total == len(expected), f"{response.total} routes in the heatmap, expected {len(expected)}"
+    assert max(errors) <= 0.5 / 255 + 1e-12, f"max quantization error {max(errors):.5f}"
+    assert all(a.delay_probability >= b.delay_probability for a, b in zip(routes, routes[1:])), \
+        "routes not returned riskiest first"
+    print(f"  ✓ {response.total} routes, max quantization error {max(errors):.5f}, riskiest first")
+
+    origin = int(origins[0])
+    from_origin = asyncio.run(api.get_heatmap(origin_airport_id=origin, limit=api.MAX_HEATMAP_ROUTES))
+    assert from_origin.total == 7 * (len(api.bundle.airport_index) - 1), \
+        f"{from_origin.total} routes from origin {origin}"
+    assert all(r.origin_airport_id == origin for r in from_origin.routes), "routes from other origins returned"
+    print(f"  ✓ {from_origin.total} routes from origin {origin}")
+
+def metric_value(text, sample):
+    """Value of one sample line, e.g. 'flight_delay_requests_total{...}', in /metrics output."""
+    for line in text.splitlines():
+        if line.startswith(sample + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+def test_metrics():
+    """Test that /metrics counts requests, errors, cache results and stage timings."""
+    print("\nTesting /metrics counters and stage histograms...")
+    load(use_prediction_table=False)
+    origin, dest = api.bundle.airport_index.ids_by_name[:2]
+    route = {'day_of_week': 3, 'origin_airport_id': int(origin), 'dest_airport_id': int(dest)}
+
+    async def run():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            before = (await client.get("/metrics")).text
+            for _ in range(3):
+                await client.post("/predict", json=route)
+            await client.post("/predict", json={**route, 'carrier': 'NOT-A-CARRIER'})
+            after = await client.get("/metrics")
+        return before, after
+
+    before, after = asyncio.run(run())
+
+    def delta(sample):
+        return metric_value(after.text, sample) - metric_value(before, sample)
+
+    expected = {
+        'flight_delay_requests_total{method="POST",endpoint="/predict",status="200"}': 3,
+        'flight_delay_errors_total{method="POST",endpoint="/predict",status="400"}': 1,
+        'flight_delay_prediction_cache_total{result="miss"}': 1,
+        'flight_delay_prediction_cache_total{result="hit"}': 2,
+        'flight_delay_validation_seconds_count{endpoint="/predict"}': 4,
+        'flight_delay_feature_build_seconds_count{step="encode"}': 3,
+        'flight_delay_inference_seconds_count{source="model"}': 1,
+    }
+    for sample, count in expected.items():
+        assert delta(sample) == count, f"{sample} went up by {delta(sample)}, expected {count}"
+    assert after.headers['content-type'].startswith('text/plain; version=0.0.4'), \
+        f"served as {after.headers['content-type']}"
+    print("  ✓ Requests, errors, cache results and stage timings counted in the Prometheus text format")
+
+def test_airport_search():
+    """Test /airports/search against a scan of every airport's name, city, state and ID."""
+    print("\nTesting /airports/search against a full scan...")
+    load(use_prediction_table=True)
+    from airport_search import normalize
+    records = api.bundle.airport_index.sorted_by_name
+
+    def scan(query):
+        """IDs of the airports a query should find, in the order /airports/search ranks them."""
+        prefix = normalize(query)
+        ranked = []
+        for record in records:
+            name, city = normalize(record['AirportName']), normalize(record['City'])
+            if name.startswith(prefix):
+                tier = 0
+            elif any(key.startswith(prefix) for key in (city, normalize(record['State']), str(record['AirportID']))):
+                tier = 1
+            elif any(word.startswith(prefix) for word in f'{name} {city}'.split()):
+                tier = 2
+            else:
+                continue
+            ranked.append((tier, record['AirportID']))
+        return [airport_id for _, airport_id in sorted(ranked, key=lambda item: item[0])]
+
+    # Every prefix of every name, plus cities, states, IDs and punctuation variants
+    queries = {record['AirportName'][:n] for record in records for n in range(1, 6)}
+    queries |= {record['City'] for record in records} | {record['State'].lower() for record in records}
+    queries |= {str(record['AirportID'])[:3] for record in records} | {"o'h", 'OHARE', 'dallas/fort', 'zzz'}
+
+    mismatches = []
+    for query in sorted(queries):
+        body = json.loads(asyncio.run(api.search_airports(query, api.MAX_SEARCH_RESULTS)).body)
+        expected = scan(query)
+        if body['total'] != len(expected) or [a['airport_id'] for a in body['airports']] != expected[:api.MAX_SEARCH_RESULTS]:
+            mismatches.append(query)
+    assert not mismatches, f"{len(mismatches)} of {len(queries)} queries differ from a full scan: {mismatches[:5]}"
+    print(f"  ✓ {len(queries)} queries match")
+
+    try:
+        asyncio.run(api.search_airports('  ', 10))
+        status = 200
+    except api.HTTPException as e:
+        status = e.status_code
+    assert status == 400, f"empty query returned {status}"
+    print("  ✓ Empty query rejected with 400")
+
+def test_lean_startup():
+    """Test that the compiled engine starts and predicts without pandas, sklearn or joblib."""
+    print("\nTesting startup on the compiled engine without heavy imports...")
+    probe = (
+        "import asyncio, json, logging, sys\n"
+        "logging.disable(logging.INFO)\n"
+        "import main\n"
+        "asyncio.run(main.load_model())\n"
+        "origin, dest = main.bundle.airport_index.ids_by_name[:2]\n"
+        "request = main.PredictionRequest(day_of_week=3, origin_airport_id=int(origin), "
+        "dest_airport_id=int(dest), carrier=main.bundle.label_classes['Carrier'][0])\n"
+        "response = asyncio.run(main.predict_delay(request))\n"
+        "print(json.dumps({'probability': response.delay_probability, "
+        "'heavy': [m for m in ('pandas', 'sklearn', 'joblib') if m in sys.modules]}))\n"
+    )
+    env = {**os.environ, 'FLIGHT_DELAY_INFERENCE_ENGINE': 'compiled', 'FLIGHT_DELAY_MODEL_WATCH_SECONDS': '0'}
+    output = subprocess.check_output(
+        [sys.executable, '-c', probe], cwd=os.path.dirname(os.path.abspath(__file__)), env=env, text=True
+    )
+    result = json.loads(output.strip().splitlines()[-1])
+    assert not result['heavy'], f"heavy modules imported: {', '.join(result['heavy'])}"
+    print(f"  ✓ Predicted {result['probability']:.4f} for a flight with a carrier, no heavy modules imported")
+
+def main():
+    """Run all tests."""
+    print("=" * 50)
+    print("Flight Delay Prediction API - Prediction Regression Tests")
+    print("=" * 50)
+
+    models_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
+    if not os.path.exists(os.path.join(models_dir, 'flight_delay_model.pkl')):
+        print("\nModel not found. Please run create_model.py first.")
+        sys.exit(1)
+
+    test_single_predictions_with_table()
+    test_single_predictions_with_model()
+    test_batch_predictions_with_model()
+    test_cached_single_predictions()
+    test_coalesced_single_predictions()
+    test_inference_pool_saturation()
+    test_hot_reload()
+    test_flight_features()
+    test_heatmap()
+    test_metrics()
+    test_airport_search()
+    test_lean_startup()
+
+    print("\n🎉 All tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Flight Delay Prediction - Inference Benchmark
+=============================================
+
+Compares single-row and 10k-row latency of sklearn's predict_proba against the
+compiled forest engine (forest_engine.py), and checks that both produce
+bit-identical probabilities.
+"""
+
+import json
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from airport_index import airport_index_path, load_airport_index
+from forest_engine import CompiledForest
+
+BATCH_ROWS = 10_000
+SINGLE_ROW_REPEATS = 200
+BATCH_REPEATS = 5
+
+def make_rows(airport_ids, n_rows, seed=42):
+    """Random but valid feature rows."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Month': rng.integers(1, 13, n_rows),
+        'DayofMonth': rng.integers(1, 32, n_rows),
+        'DayOfWeek': rng.integers(1, 8, n_rows),
+        'OriginAirportID': rng.choice(airport_ids, n_rows),
+        'DestAirportID': rng.choice(airport_ids, n_rows),
+        'CRSDepTime_Hour': rng.integers(0, 24, n_rows),
+        'CRSArrTime_Hour': rng.integers(0, 24, n_rows),
+        'Carrier': rng.integers(0, 16, n_rows)
+    })
+
+def time_calls(fn, inputs):
+    """Latencies in milliseconds of fn over each input."""
+    latencies = []
+    for X in inputs:
+        start = time.perf_counter()
+        fn(X)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+def summarize(latencies):
+    return {
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'mean_ms': float(latencies.mean())
+    }
+
+def main():
+    """Run the benchmark."""
+    print("Flight Delay Prediction - Inference Benchmark")
+    print("=" * 45)
+
+    model = joblib.load('models/flight_delay_model.pkl')
+    airport_ids = list(load_airport_index(airport_index_path('models')).ids)
+
+    start = time.perf_counter()
+    compiled = CompiledForest.from_sklearn(model)
+    print(f"Compiled {compiled.n_estimators} trees in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    batch = make_rows(airport_ids, BATCH_ROWS)
+    single_rows = [batch.iloc[[i]] for i in range(SINGLE_ROW_REPEATS)]
+
+    # Correctness: probabilities must match sklearn bit for bit
+    identical = np.array_equal(model.predict_proba(batch), compiled.predict_proba(batch))
+    print(f"Bit-identical probabilities on {BATCH_ROWS} rows: {identical}")
+
+    results = {'identical': bool(identical)}
+    for name, engine in (('sklearn', model), ('compiled', compiled)):
+        results[name] = {
+            'single_row': summarize(time_calls(engine.predict_proba, single_rows)),
+            f'{BATCH_ROWS}_rows': summarize(time_calls(engine.predict_proba, [batch] * BATCH_REPEATS))
+        }
+
+    print(f"\n{'Engine':<10} {'1 row p50':>12} {'1 row p99':>12} {f'{BATCH_ROWS} rows p50':>16}")
+    for name in ('sklearn', 'compiled'):
+        single = results[name]['single_row']
+        bulk = results[name][f'{BATCH_ROWS}_rows']
+        print(f"{name:<10} {single['p50_ms']:>9.3f} ms {single['p99_ms']:>9.3f} ms {bulk['p50_ms']:>13.1f} ms")
+
+    print("\nJSON results:")
+    print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
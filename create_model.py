@@ -5,17 +5,40 @@ Flight Delay Prediction Model
 
 This script creates a machine learning model to predict flight delays based on the flights.csv dataset.
 The model predicts the probability that a flight will be delayed by more than 15 minutes.
+
+For data that arrives a month at a time, --incremental DIR trains from one CSV
+per month instead. Each file is parsed once into a feature shard; when a new
+month is added, the forest is grown with --new-trees warm-start trees fitted
+on that month alone and evaluated on the test split of the original training:
+
+    python create_model.py --incremental data/monthly
+    python create_model.py --incremental data/monthly --incremental-strategy retrain
 """
 
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.preprocessing import LabelEncoder, OrdinalEncoder
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import make_pipeline
 from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score
+from pandas.api.types import union_categoricals
 import joblib
 import json
 import os
+import argparse
+import tempfile
+import time
+
+from airport_index import AIRPORTS_BINARY, encode_airport_binary, write_airport_binary
+from flight_features import FEATURE_COLUMNS, FeatureBuilder, save_label_classes, scheduled_hour
+from forest_engine import (
+    CompiledForest, model_fingerprint, remove_compiled_forest, save_compiled_forest, MODEL_ARRAYS, MODEL_INFO
+)
+import feature_cache
+import feature_shards
+import model_tuning
 
 def load_and_explore_data(file_path):
     """Load the CSV data and perform initial exploration."""
@@ -48,22 +71,178 @@ def clean_data(df):
     print(f"Data shape after removing cancelled flights: {df_clean.shape}")
     
     # Create additional time-based features
-    df_clean['CRSDepTime_Hour'] = (df_clean['CRSDepTime'] // 100).astype(int)
-    df_clean['CRSArrTime_Hour'] = (df_clean['CRSArrTime'] // 100).astype(int)
+    df_clean['CRSDepTime_Hour'] = scheduled_hour(df_clean['CRSDepTime']).astype(int)
+    df_clean['CRSArrTime_Hour'] = scheduled_hour(df_clean['CRSArrTime']).astype(int)
     
     return df_clean
 
+# Columns read by the streaming loader, with compact dtypes; integer columns
+# are nullable so blank values parse, and clean_chunk fills them with 0
+STREAM_DTYPES = {
+    'Month': 'Int8',
+    'DayofMonth': 'Int8',
+    'DayOfWeek': 'Int8',
+    'Carrier': 'category',
+    'OriginAirportID': 'Int32',
+    'OriginAirportName': 'category',
+    'OriginCity': 'category',
+    'OriginState': 'category',
+    'DestAirportID': 'Int32',
+    'DestAirportName': 'category',
+    'DestCity': 'category',
+    'DestState': 'category',
+    'CRSDepTime': 'Int16',
+    'CRSArrTime': 'Int16',
+    'ArrDel15': 'float32',
+    'Cancelled': 'float32'
+}
+
+AIRPORT_COLUMNS = ['AirportID', 'AirportName', 'City', 'State']
+
+class AirportCollector:
+    """
+    Airport dimension collected while flights are ingested: the first name,
+    city and state seen for each airport ID, as origin or destination.
+    
+    Each chunk only costs a duplicate check on its two ID columns; name
+    columns are read just for the few rows that introduce a new airport, so
+    the full flight table is never copied to build the airports.
+    """
+    
+    def __init__(self):
+        self.records = {}
+    
+    def add(self, flights):
+        """Record the airports in a chunk of flights that have not been seen yet."""
+        for prefix in ('Origin', 'Dest'):
+            ids = flights[f'{prefix}AirportID'].to_numpy()
+            # Positions of each ID's first row in this chunk, then only unseen IDs
+            first = np.flatnonzero(~pd.Series(ids).duplicated().to_numpy())
+            first = [i for i in first if int(ids[i]) not in self.records]
+            if not first:
+                continue
+            rows = flights.iloc[first][[f'{prefix}AirportName', f'{prefix}City', f'{prefix}State']]
+            for i, (name, city, state) in zip(first, rows.itertuples(index=False)):
+                self.records[int(ids[i])] = (name, city, state)
+    
+    def to_frame(self):
+        """Collected airports sorted by ID, with AIRPORT_COLUMNS."""
+        return pd.DataFrame(
+            [(airport_id, *self.records[airport_id]) for airport_id in sorted(self.records)],
+            columns=AIRPORT_COLUMNS
+        )
+
+def extract_airports(df):
+    """Unique airports (first name seen per ID) from the origin and destination columns."""
+    airports = AirportCollector()
+    airports.add(df)
+    return airports.to_frame()
+
+def read_stream_chunks(file_path, chunk_size):
+    """Read only the needed CSV columns, with compact dtypes, in chunks."""
+    return pd.read_csv(
+        file_path, usecols=list(STREAM_DTYPES), dtype=STREAM_DTYPES, chunksize=chunk_size
+    )
+
+def clean_chunk(chunk, airports):
+    """
+    Clean one chunk like clean_data (missing values -> 0, cancelled flights
+    dropped), add its hour features and collect its airports.
+    
+    Returns:
+        Tuple of (numeric features, target, raw carriers)
+    """
+    # Same cleaning as clean_data, on numeric columns only
+    cancelled = chunk['Cancelled'].fillna(0) != 0
+    chunk = chunk[~cancelled].copy()
+    for column, dtype in (('Month', 'int8'), ('DayofMonth', 'int8'), ('DayOfWeek', 'int8'),
+                          ('OriginAirportID', 'int32'), ('DestAirportID', 'int32')):
+        chunk[column] = chunk[column].fillna(0).astype(dtype)
+    airports.add(chunk)
+    
+    features = pd.DataFrame({
+        'Month': chunk['Month'],
+        'DayofMonth': chunk['DayofMonth'],
+        'DayOfWeek': chunk['DayOfWeek'],
+        'OriginAirportID': chunk['OriginAirportID'],
+        'DestAirportID': chunk['DestAirportID'],
+        'CRSDepTime_Hour': scheduled_hour(chunk['CRSDepTime'].fillna(0)).astype('int8'),
+        'CRSArrTime_Hour': scheduled_hour(chunk['CRSArrTime'].fillna(0)).astype('int8')
+    })
+    return features, chunk['ArrDel15'].fillna(0).astype('int8'), chunk['Carrier']
+
+def stream_features(file_path, chunk_size=500_000):
+    """
+    Stream the CSV in chunks and build the feature matrix incrementally.
+    
+    Only the needed columns are parsed, with compact dtypes. Each chunk is
+    cleaned like clean_data (missing values -> 0, cancelled flights dropped),
+    gets its hour features, and is reduced to the feature columns and target,
+    so peak memory is one raw chunk plus the compact feature matrix.
+    
+    Returns:
+        Tuple of (X, y, label_encoders, feature_columns, airports)
+    """
+    print(f"\nStreaming data from {file_path} in chunks of {chunk_size:,} rows...")
+    
+    feature_chunks = []
+    target_chunks = []
+    carrier_chunks = []
+    airports = AirportCollector()
+    rows_read = 0
+    
+    for chunk in read_stream_chunks(file_path, chunk_size):
+        rows_read += len(chunk)
+        features, target, carriers = clean_chunk(chunk, airports)
+        feature_chunks.append(features)
+        target_chunks.append(target)
+        carrier_chunks.append(carriers)
+        
+        print(f"  Processed {rows_read:,} rows")
+    
+    X = pd.concat(feature_chunks, ignore_index=True)
+    del feature_chunks
+    y = pd.concat(target_chunks, ignore_index=True)
+    
+    # Encode carriers against the union of all chunks' categories,
+    # giving the same codes as LabelEncoder.fit_transform on the full column
+    carriers = union_categoricals(carrier_chunks, sort_categories=True)
+    label_encoders = {'Carrier': LabelEncoder().fit(carriers.categories)}
+    X['Carrier'] = carriers.codes.astype('int16')
+    X = X[FEATURE_COLUMNS]
+    
+    print(f"Data shape after removing cancelled flights: {X.shape}")
+    print(f"Feature matrix memory: {X.memory_usage(deep=True).sum() / 1e6:.1f} MB")
+    
+    return X, y, label_encoders, list(FEATURE_COLUMNS), airports.to_frame()
+
+def read_partition(file_path, chunk_size=500_000):
+    """
+    Clean one partition file (e.g. a month of flights) for the feature shards.
+    
+    Returns:
+        Tuple of (features with the raw Carrier column, y, airports)
+    """
+    feature_chunks = []
+    target_chunks = []
+    carrier_chunks = []
+    airports = AirportCollector()
+    for chunk in read_stream_chunks(file_path, chunk_size):
+        features, target, carriers = clean_chunk(chunk, airports)
+        feature_chunks.append(features)
+        target_chunks.append(target)
+        carrier_chunks.append(carriers)
+    
+    features = pd.concat(feature_chunks, ignore_index=True)
+    features['Carrier'] = union_categoricals(carrier_chunks, sort_categories=True)
+    return features[FEATURE_COLUMNS], pd.concat(target_chunks, ignore_index=True), airports.to_frame()
+
 def prepare_features(df):
     """Prepare features for the model."""
     print("\nPreparing features...")
     
     # Select relevant features for prediction
-    feature_columns = [
-        'Month', 'DayofMonth', 'DayOfWeek',
-        'OriginAirportID', 'DestAirportID',
-        'CRSDepTime_Hour', 'CRSArrTime_Hour',
-        'Carrier'
-    ]
+    feature_columns = list(FEATURE_COLUMNS)
     
     X = df[feature_columns].copy()
     y = df['ArrDel15']
@@ -82,27 +261,57 @@ def prepare_features(df):
     
     return X, y, label_encoders, feature_columns
 
-def train_model(X, y):
-    """Train the Random Forest model."""
-    print("\nTraining model...")
-    
-    # Split the data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
-    
-    # Train Random Forest model
-    model = RandomForestClassifier(
-        n_estimators=100,
-        random_state=42,
-        max_depth=10,
-        min_samples_split=100,
-        n_jobs=-1
-    )
-    
-    model.fit(X_train, y_train)
-    
-    # Evaluate the model
+# Random Forest settings used unless tuning picks others
+DEFAULT_FOREST_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 10,
+    'min_samples_split': 100
+}
+
+# Histogram gradient boosting settings
+DEFAULT_HIST_GRADIENT_BOOSTING_PARAMS = {
+    'max_iter': 200,
+    'learning_rate': 0.1,
+    'max_leaf_nodes': 31
+}
+
+MODEL_TYPES = ('random_forest', 'hist_gradient_boosting')
+
+# Features handled natively as categories by hist_gradient_boosting
+CATEGORICAL_FEATURES = ['Carrier', 'OriginAirportID', 'DestAirportID']
+
+# Histogram gradient boosting supports at most this many categories per feature
+MAX_CATEGORIES = 255
+
+def build_model(model_type, X, params=None):
+    """Create an unfitted model of the given family."""
+    if model_type == 'random_forest':
+        return RandomForestClassifier(
+            random_state=42,
+            n_jobs=-1,
+            **{**DEFAULT_FOREST_PARAMS, **(params or {})}
+        )
+    
+    if model_type == 'hist_gradient_boosting':
+        # IDs are not small non-negative integers, so ordinal-encode them first;
+        # unknown values become NaN, which the booster treats as missing
+        categorical = [col for col in CATEGORICAL_FEATURES if X[col].nunique() <= MAX_CATEGORIES]
+        encoder = ColumnTransformer(
+            [('categories', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=np.nan),
+              categorical)],
+            remainder='passthrough'
+        )
+        print(f"Native categorical features: {categorical}")
+        return make_pipeline(encoder, HistGradientBoostingClassifier(
+            categorical_features=list(range(len(categorical))),
+            random_state=42,
+            **{**DEFAULT_HIST_GRADIENT_BOOSTING_PARAMS, **(params or {})}
+        ))
+    
+    raise ValueError(f"Unknown model type {model_type!r}, expected one of {MODEL_TYPES}")
+
+def evaluate_model(model, X_test, y_test):
+    """Print AUC, classification report, confusion matrix and feature importance on held-out data."""
     y_pred = model.predict(X_test)
     y_pred_proba = model.predict_proba(X_test)[:, 1]
     
@@ -116,53 +325,132 @@ def train_model(X, y):
     print(confusion_matrix(y_test, y_pred))
     
     # Feature importance
-    feature_importance = pd.DataFrame({
-        'feature': X.columns,
-        'importance': model.feature_importances_
-    }).sort_values('importance', ascending=False)
+    if hasattr(model, 'feature_importances_'):
+        feature_importance = pd.DataFrame({
+            'feature': X_test.columns,
+            'importance': model.feature_importances_
+        }).sort_values('importance', ascending=False)
+        
+        print("\nTop 10 Most Important Features:")
+        print(feature_importance.head(10))
+
+def split_data(X, y):
+    """Split into training and held-out rows; the same X, y always split the same way."""
+    return train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+def train_model(X, y, params=None, model_type='random_forest'):
+    """Train a model of the given family (Random Forest by default)."""
+    print(f"\nTraining {model_type} model...")
+    
+    # Split the data
+    X_train, X_test, y_train, y_test = split_data(X, y)
+    
+    model = build_model(model_type, X_train, params)
     
-    print("\nTop 10 Most Important Features:")
-    print(feature_importance.head(10))
+    model.fit(X_train, y_train)
+    
+    evaluate_model(model, X_test, y_test)
     
     return model, X_test, y_test
 
-def save_model_and_metadata(model, label_encoders, feature_columns, df):
-    """Save the model and create airport metadata file."""
+def artifact_report(model, X_test, y_test, latency_rows=100):
+    """Measure AUC, pickled size, load time and single-row latency of a trained model."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'model.pkl')
+        joblib.dump(model, path)
+        size_mb = os.path.getsize(path) / 1e6
+        
+        start = time.perf_counter()
+        joblib.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+    
+    latencies = []
+    for i in range(min(latency_rows, len(X_test))):
+        row = X_test.iloc[[i]]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        latencies.append((time.perf_counter() - start) * 1000)
+    
+    return {
+        'auc': roc_auc_score(y_test, model.predict_proba(X_test)[:, 1]),
+        'artifact_mb': size_mb,
+        'load_ms': load_ms,
+        'single_row_ms': float(np.median(latencies))
+    }
+
+def print_model_comparison(reports):
+    """Print artifact_report results for several model types side by side."""
+    print("\nModel Comparison:")
+    print("=================")
+    print(f"{'model type':<24} {'AUC':>7} {'size MB':>9} {'load ms':>9} {'1-row ms':>9}")
+    for model_type, report in reports.items():
+        print(
+            f"{model_type:<24} {report['auc']:>7.4f} {report['artifact_mb']:>9.2f} "
+            f"{report['load_ms']:>9.1f} {report['single_row_ms']:>9.2f}"
+        )
+
+def save_model_and_metadata(model, label_encoders, feature_columns, airports,
+                            model_type='random_forest', params=None, partitions=None,
+                            holdout_partitions=None):
+    """
+    Save the model and create airport metadata file.
+    
+    partitions maps the names of the feature shards the model was trained on
+    to their content hashes, so incremental training knows what is new.
+    holdout_partitions names the shards whose test split the model was last
+    fully trained against, so grown models are evaluated on the same rows.
+    """
     print("\nSaving model and metadata...")
     
+    # Encode the airport index before writing anything, so bad airport data
+    # cannot leave a new model next to the old airports
+    airport_binary = encode_airport_binary(airports.to_dict('records'))
+    
     # Create models directory
     os.makedirs('models', exist_ok=True)
     
     # Save the trained model
     joblib.dump(model, 'models/flight_delay_model.pkl')
     
-    # Save label encoders
+    # Record which model family the pickle holds
+    with open(os.path.join('models', MODEL_INFO), 'w') as f:
+        info = {'model_type': model_type, 'params': params or {}}
+        if partitions is not None:
+            info['partitions'] = partitions
+        if holdout_partitions is not None:
+            info['holdout_partitions'] = holdout_partitions
+        json.dump(info, f, indent=2)
+    
+    # Save the memory-mappable array version used by the compiled inference engine;
+    # only forests can be compiled, so drop arrays left over from an older forest
+    arrays_dir = os.path.join('models', MODEL_ARRAYS)
+    if model_type == 'random_forest':
+        save_compiled_forest(
+            CompiledForest.from_sklearn(model), arrays_dir, model_fingerprint('models/flight_delay_model.pkl')
+        )
+    else:
+        remove_compiled_forest(arrays_dir)
+    
+    # Save label encoders, and their classes as JSON for serving without sklearn
     joblib.dump(label_encoders, 'models/label_encoders.pkl')
+    save_label_classes(label_encoders, 'models')
     
     # Save feature columns
     with open('models/feature_columns.json', 'w') as f:
         json.dump(feature_columns, f)
     
-    # Create airport names and IDs file (requirement #4)
-    airports_origin = df[['OriginAirportID', 'OriginAirportName', 'OriginCity', 'OriginState']].drop_duplicates()
-    airports_dest = df[['DestAirportID', 'DestAirportName', 'DestCity', 'DestState']].drop_duplicates()
-    
-    # Rename columns for consistency
-    airports_origin.columns = ['AirportID', 'AirportName', 'City', 'State']
-    airports_dest.columns = ['AirportID', 'AirportName', 'City', 'State']
-    
-    # Combine and remove duplicates
-    airports = pd.concat([airports_origin, airports_dest]).drop_duplicates('AirportID').sort_values('AirportID')
-    
-    # Save airports file
+    # Save airport names and IDs file (requirement #4), plus the binary index the API loads
     airports.to_csv('models/airports.csv', index=False)
+    write_airport_binary(airport_binary, os.path.join('models', AIRPORTS_BINARY))
     
-    print(f"Model saved to: models/flight_delay_model.pkl")
-    print(f"Label encoders saved to: models/label_encoders.pkl")
+    print(f"Model saved to: models/flight_delay_model.pkl ({model_type})")
+    if model_type == 'random_forest':
+        print(f"Model arrays saved to: models/{MODEL_ARRAYS}/")
+    print(f"Label encoders saved to: models/label_encoders.pkl and models/label_classes.json")
     print(f"Feature columns saved to: models/feature_columns.json")
-    print(f"Airport data saved to: models/airports.csv ({len(airports)} airports)")
+    print(f"Airport data saved to: models/airports.csv and models/{AIRPORTS_BINARY} ({len(airports)} airports)")
 
-def predict_delay_probability(model, label_encoders, feature_columns, 
+def predict_delay_probability(model, feature_builder,
                              month, day_of_month, day_of_week, 
                              origin_airport_id, dest_airport_id, 
                              dep_hour, arr_hour, carrier):
@@ -170,6 +458,7 @@ def predict_delay_probability(model, label_encoders, feature_columns,
     Predict delay probability for a given flight.
     
     Args:
+        feature_builder: FeatureBuilder for the model's encoders and columns
         month: Month (1-12)
         day_of_month: Day of month (1-31)
         day_of_week: Day of week (1=Monday, 7=Sunday)
@@ -182,48 +471,311 @@ def predict_delay_probability(model, label_encoders, feature_columns,
     Returns:
         Probability of delay > 15 minutes
     """
-    # Create input data
-    input_data = pd.DataFrame({
-        'Month': [month],
-        'DayofMonth': [day_of_month],
-        'DayOfWeek': [day_of_week],
-        'OriginAirportID': [origin_airport_id],
-        'DestAirportID': [dest_airport_id],
-        'CRSDepTime_Hour': [dep_hour],
-        'CRSArrTime_Hour': [arr_hour],
-        'Carrier': [carrier]
+    # Create input data; unknown carriers fall back to code 0
+    input_data = feature_builder.build(1, {
+        'Month': month,
+        'DayofMonth': day_of_month,
+        'DayOfWeek': day_of_week,
+        'OriginAirportID': origin_airport_id,
+        'DestAirportID': dest_airport_id,
+        'CRSDepTime_Hour': dep_hour,
+        'CRSArrTime_Hour': arr_hour,
+        'Carrier': feature_builder.encode('Carrier', [carrier], unknown=0)
     })
     
-    # Encode categorical variables
-    if carrier in label_encoders['Carrier'].classes_:
-        input_data['Carrier'] = label_encoders['Carrier'].transform([carrier])
-    else:
-        # Handle unknown carrier
-        input_data['Carrier'] = 0
-    
     # Make prediction
     probability = model.predict_proba(input_data)[0, 1]
     return probability
 
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Train the flight delay prediction model.")
+    parser.add_argument('--data', default='data/flights.csv', help="Path to the flights CSV file")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Read the CSV in chunks with compact dtypes instead of all at once")
+    parser.add_argument('--chunk-size', type=int, default=500_000,
+                        help="Rows per chunk in streaming mode (default: 500000)")
+    parser.add_argument('--cache-dir', default='data/cache',
+                        help="Directory for the cached feature table (default: data/cache)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Neither read nor write the feature cache")
+    parser.add_argument('--rebuild-cache', action='store_true',
+                        help="Ignore any cached feature table and rebuild it from the CSV")
+    parser.add_argument('--model-type', choices=MODEL_TYPES, default='random_forest',
+                        help="Model family to train and save (default: random_forest)")
+    parser.add_argument('--compare-models', action='store_true',
+                        help="Also train every other model family and compare size, load time, latency and AUC")
+    parser.add_argument('--tune', action='store_true',
+                        help="Cross-validate a grid of forest parameters and train with the best one")
+    parser.add_argument('--tune-samples', type=int, default=0,
+                        help="Randomly sample this many configurations instead of the full grid")
+    parser.add_argument('--cv-folds', type=int, default=5,
+                        help="Stratified cross-validation folds when tuning (default: 5)")
+    parser.add_argument('--tune-workers', type=int, default=None,
+                        help="Worker processes when tuning (default: one per CPU)")
+    parser.add_argument('--max-latency-ms', type=float, default=None,
+                        help="Only select configurations scoring one row within this many ms")
+    parser.add_argument('--incremental', metavar='DIR',
+                        help="Train from a directory of partition CSVs (e.g. one per month), "
+                             "keeping per-partition feature shards in CACHE_DIR/shards and "
+                             "only parsing new or changed files")
+    parser.add_argument('--incremental-strategy', choices=('auto', 'retrain'), default='auto',
+                        help="auto grows the current forest with warm-start trees on new partitions "
+                             "when possible; retrain fits a new model on all shards (default: auto)")
+    parser.add_argument('--new-trees', type=int, default=10,
+                        help="Trees added per incremental warm-start run (default: 10)")
+    return parser.parse_args()
+
+def train_from_csv(args):
+    """
+    Train on the whole CSV file (or its cached feature table).
+    
+    Returns:
+        Tuple of (model, label_encoders, feature_columns, airports, params)
+    """
+    use_cache = not args.no_cache and feature_cache.cache_available()
+    if not args.no_cache and not use_cache:
+        print("pyarrow is not installed; training without the feature cache")
+    
+    cached = None
+    if use_cache:
+        key = feature_cache.cache_key(args.data, FEATURE_COLUMNS)
+        if not args.rebuild_cache:
+            cached = feature_cache.load_feature_cache(args.cache_dir, key)
+    
+    if cached is not None:
+        # Cleaned feature table from a previous run on the same file
+        X, y, label_encoders, feature_columns, airports = cached
+        print(f"\nLoaded cached feature table {key} from {args.cache_dir}: {X.shape}")
+    else:
+        if args.streaming:
+            # Stream, clean and build features chunk by chunk
+            X, y, label_encoders, feature_columns, airports = stream_features(args.data, args.chunk_size)
+        else:
+            # Load and explore data
+            df = load_and_explore_data(args.data)
+            
+            # Clean data
+            df_clean = clean_data(df)
+            
+            # Prepare features
+            X, y, label_encoders, feature_columns = prepare_features(df_clean)
+            airports = extract_airports(df_clean)
+        
+        if use_cache:
+            feature_cache.save_feature_cache(
+                args.cache_dir, key, X, y, label_encoders, feature_columns, airports
+            )
+            print(f"Cached feature table {key} in {args.cache_dir}")
+    
+    params = None
+    if args.tune and args.model_type != 'random_forest':
+        raise SystemExit("--tune only searches random_forest parameters")
+    if args.tune:
+        results = model_tuning.tune(
+            X, y, n_samples=args.tune_samples, n_folds=args.cv_folds, n_workers=args.tune_workers
+        )
+        model_tuning.print_report(results)
+        
+        os.makedirs('models', exist_ok=True)
+        with open('models/tuning_results.json', 'w') as f:
+            json.dump(results, f, indent=2)
+        print("Tuning results saved to: models/tuning_results.json")
+        
+        params = model_tuning.select_config(results, args.max_latency_ms)['params']
+        print(f"Selected parameters: {params}")
+    
+    # Train model
+    model, X_test, y_test = train_model(X, y, params, args.model_type)
+    reports = {args.model_type: artifact_report(model, X_test, y_test)}
+    
+    if args.compare_models:
+        for model_type in MODEL_TYPES:
+            if model_type != args.model_type:
+                other, other_X_test, other_y_test = train_model(X, y, model_type=model_type)
+                reports[model_type] = artifact_report(other, other_X_test, other_y_test)
+    print_model_comparison(reports)
+    
+    return model, label_encoders, feature_columns, airports, params
+
+def load_model_info():
+    """Contents of the current models/model_info.json, or {} if there is none."""
+    path = os.path.join('models', MODEL_INFO)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def encode_carriers(features, label_encoder=None):
+    """
+    Label-encode the raw Carrier column of combined feature shards.
+    
+    Without an encoder, one is fitted on the carriers present, giving the same
+    codes as LabelEncoder.fit_transform. With an encoder, carriers it does not
+    know are returned instead of being encoded.
+    
+    Returns:
+        Tuple of (X, label_encoders, unknown carriers)
+    """
+    if label_encoder is None:
+        label_encoder = LabelEncoder().fit(features['Carrier'].unique())
+    codes = pd.Categorical(features['Carrier'], categories=label_encoder.classes_).codes
+    unknown = sorted(features['Carrier'][codes == -1].unique())
+    X = features.assign(Carrier=codes.astype('int16'))
+    return X[FEATURE_COLUMNS], {'Carrier': label_encoder}, unknown
+
+def extend_forest(model, X, y, new_trees, X_test, y_test):
+    """
+    Grow a fitted Random Forest with new_trees trees fitted on all of X, y.
+    
+    The existing trees are kept as they are (warm start), so the cost is that
+    of fitting new_trees trees on the new rows. X_test, y_test must be rows
+    none of the trees were fitted on.
+    
+    Returns:
+        The grown model
+    """
+    print(f"\nAdding {new_trees} trees to the {len(model.estimators_)}-tree forest...")
+    
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + new_trees)
+    model.fit(X, y)
+    # A later fit of the saved model starts from scratch again
+    model.set_params(warm_start=False)
+    
+    evaluate_model(model, X_test, y_test)
+    
+    return model
+
+def load_holdout(shard_dir, holdout_partitions, label_encoder):
+    """
+    Held-out rows of the last full training, split again from its shards.
+    
+    Shards load in the same order and split_data is deterministic, so these
+    are the rows train_model held out, which no tree has been fitted on.
+    """
+    features, y, _ = feature_shards.load_shards(shard_dir, holdout_partitions)
+    X, _, _ = encode_carriers(features, label_encoder)
+    _, X_test, _, y_test = split_data(X, y)
+    return X_test, y_test
+
+def warm_start_blocker(args, info, partitions, feature_columns):
+    """Why the current model cannot be grown with the new partitions, or None if it can."""
+    trained = info.get('partitions')
+    if args.incremental_strategy == 'retrain':
+        return "retraining was requested"
+    if not info or not os.path.exists('models/flight_delay_model.pkl'):
+        return "there is no current model to grow"
+    if args.model_type != 'random_forest' or info.get('model_type') != 'random_forest':
+        return "only random_forest models can be grown"
+    if trained is None:
+        return "the current model was not trained from feature shards"
+    if 'holdout_partitions' not in info:
+        return "the current model has no recorded test split to evaluate new trees on"
+    if any(partitions.get(name) != digest for name, digest in trained.items()):
+        return "partitions the model was trained on changed or were removed"
+    if feature_columns != list(FEATURE_COLUMNS):
+        return "the current model uses different feature columns"
+    return None
+
+def train_incremental(args):
+    """
+    Train on a directory of partition files (e.g. one CSV per month), parsing
+    only files that are new or changed since the last run.
+    
+    If the current model is a Random Forest trained on an unchanged subset of
+    the partitions, it is grown with warm-start trees fitted on the new
+    partitions alone; otherwise a new model is trained on all cached shards.
+    
+    Returns:
+        Tuple of (model, label_encoders, feature_columns, airports, model_type,
+        params, partitions, holdout_partitions), or None if the model is
+        already up to date
+    """
+    if not feature_cache.cache_available():
+        raise SystemExit("--incremental requires pyarrow (pip install pyarrow)")
+    if args.tune:
+        raise SystemExit("--tune is not supported with --incremental")
+    
+    start = time.perf_counter()
+    shard_dir = os.path.join(args.cache_dir, 'shards')
+    print(f"\nSyncing feature shards of {args.incremental} in {shard_dir}...")
+    partitions = {
+        name: shard['hash'] for name, shard in feature_shards.sync_shards(
+            args.incremental, shard_dir, lambda path: read_partition(path, args.chunk_size)
+        ).items()
+    }
+    if not partitions:
+        raise SystemExit(f"No CSV files found in {args.incremental}")
+    
+    info = load_model_info()
+    if info.get('partitions') == partitions:
+        print("\nThe model is already trained on every partition")
+        return None
+    
+    feature_columns = None
+    if os.path.exists('models/feature_columns.json'):
+        with open('models/feature_columns.json') as f:
+            feature_columns = json.load(f)
+    
+    blocker = warm_start_blocker(args, info, partitions, feature_columns)
+    if blocker is None:
+        new = [name for name in partitions if name not in info['partitions']]
+        features, y, new_airports = feature_shards.load_shards(shard_dir, new)
+        label_encoders = joblib.load('models/label_encoders.pkl')
+        X, label_encoders, unknown = encode_carriers(features, label_encoders['Carrier'])
+        if unknown:
+            blocker = f"new carriers {unknown} change the label encoding"
+    
+    if blocker is None:
+        print(f"\nGrowing the current model with {', '.join(new)} ({len(X):,} rows)")
+        model = joblib.load('models/flight_delay_model.pkl')
+        holdout_partitions = info['holdout_partitions']
+        X_test, y_test = load_holdout(shard_dir, holdout_partitions, label_encoders['Carrier'])
+        model = extend_forest(model, X, y, args.new_trees, X_test, y_test)
+        airports = pd.concat([pd.read_csv('models/airports.csv'), new_airports])
+        airports = airports.drop_duplicates('AirportID').sort_values('AirportID')
+        model_type = 'random_forest'
+        # The forest now has more trees than its recorded parameters say
+        fitted = model.get_params()
+        params = {key: fitted[key] for key in {**DEFAULT_FOREST_PARAMS, **(info.get('params') or {})}}
+    else:
+        print(f"\nRetraining on all {len(partitions)} partitions: {blocker}")
+        features, y, airports = feature_shards.load_shards(shard_dir, list(partitions))
+        X, label_encoders, _ = encode_carriers(features)
+        model_type = args.model_type
+        # Keep tuned parameters of the same model family
+        params = info.get('params') if info.get('model_type') == model_type else None
+        model, X_test, y_test = train_model(X, y, params, model_type)
+        holdout_partitions = list(partitions)
+    
+    print_model_comparison({model_type: artifact_report(model, X_test, y_test)})
+    print(f"\nIncremental training took {time.perf_counter() - start:.1f}s")
+    
+    return (model, label_encoders, list(FEATURE_COLUMNS), airports, model_type, params, partitions,
+            holdout_partitions)
+
 def main():
     """Main execution function."""
+    args = parse_args()
+    
     print("Flight Delay Prediction Model Creation")
     print("=" * 40)
     
-    # Load and explore data
-    df = load_and_explore_data('data/flights.csv')
-    
-    # Clean data
-    df_clean = clean_data(df)
-    
-    # Prepare features
-    X, y, label_encoders, feature_columns = prepare_features(df_clean)
-    
-    # Train model
-    model, X_test, y_test = train_model(X, y)
+    if args.incremental:
+        trained = train_incremental(args)
+        if trained is None:
+            return
+        (model, label_encoders, feature_columns, airports, model_type, params, partitions,
+         holdout_partitions) = trained
+    else:
+        model, label_encoders, feature_columns, airports, params = train_from_csv(args)
+        model_type, partitions, holdout_partitions = args.model_type, None, None
     
     # Save model and metadata
-    save_model_and_metadata(model, label_encoders, feature_columns, df_clean)
+    save_model_and_metadata(
+        model, label_encoders, feature_columns, airports, model_type, params, partitions,
+        holdout_partitions
+    )
     
     print("\n" + "=" * 50)
     print("Model creation completed successfully!")
@@ -235,7 +787,7 @@ def main():
     # Example prediction
     print("\nExample prediction:")
     prob = predict_delay_probability(
-        model, label_encoders, feature_columns,
+        model, FeatureBuilder(label_encoders, feature_columns),
         month=12, day_of_month=15, day_of_week=5,  # Friday, Dec 15
         origin_airport_id=13930,  # Chicago O'Hare
         dest_airport_id=12892,    # Los Angeles
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Feature Cache
+=============
+
+Caches the cleaned, feature-engineered training table in uncompressed Feather
+(Arrow IPC) files so repeat training runs skip CSV parsing and cleaning.
+Uncompressed Feather can be memory-mapped, so loading is close to zero-copy.
+
+Cache entries are keyed by a hash of the source file contents and the feature
+list. Requires pyarrow; without it training simply runs uncached.
+"""
+
+import hashlib
+import json
+import os
+
+from sklearn.preprocessing import LabelEncoder
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+# Bump whenever cleaning or feature engineering changes what gets cached
+CACHE_VERSION = 1
+
+TARGET_COLUMN = 'ArrDel15'
+
+
+def cache_available():
+    """Whether pyarrow is installed."""
+    return feather is not None
+
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(source_path, feature_columns):
+    """Key for a source file and feature list."""
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_VERSION}:".encode())
+    digest.update(file_hash(source_path).encode())
+    digest.update(json.dumps(list(feature_columns)).encode())
+    return digest.hexdigest()[:24]
+
+
+def _paths(cache_dir, key):
+    return (
+        os.path.join(cache_dir, f'features-{key}.feather'),
+        os.path.join(cache_dir, f'airports-{key}.feather'),
+        os.path.join(cache_dir, f'features-{key}.json'),
+    )
+
+
+def save_feature_cache(cache_dir, key, X, y, label_encoders, feature_columns, airports):
+    """Write the training table, airports and encoder classes for a cache key."""
+    features_path, airports_path, meta_path = _paths(cache_dir, key)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    table = X.reset_index(drop=True).copy()
+    table[TARGET_COLUMN] = y.reset_index(drop=True)
+    feather.write_feather(table, features_path, compression='uncompressed')
+    feather.write_feather(airports.reset_index(drop=True), airports_path, compression='uncompressed')
+
+    # Metadata is written last and marks the entry as complete
+    with open(meta_path, 'w') as f:
+        json.dump({
+            'version': CACHE_VERSION,
+            'feature_columns': list(feature_columns),
+            'label_encoders': {
+                col: le.classes_.tolist() for col, le in label_encoders.items()
+            }
+        }, f)
+
+
+def load_feature_cache(cache_dir, key):
+    """
+    Load a cache entry, memory-mapping the feature table.
+
+    Returns:
+        Tuple of (X, y, label_encoders, feature_columns, airports), or None on a miss
+    """
+    features_path, airports_path, meta_path = _paths(cache_dir, key)
+    if not os.path.exists(meta_path):
+        return None
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+
+    table = feather.read_table(features_path, memory_map=True)
+    # split_blocks keeps each column as its own block, avoiding a consolidation copy
+    df = table.to_pandas(split_blocks=True)
+    feature_columns = meta['feature_columns']
+
+    label_encoders = {
+        col: LabelEncoder().fit(classes) for col, classes in meta['label_encoders'].items()
+    }
+    airports = feather.read_table(airports_path).to_pandas()
+
+    return df[feature_columns], df[TARGET_COLUMN], label_encoders, feature_columns, airports
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Feature Shards
+==============
+
+Per-partition cache of the cleaned training table for incremental training.
+Each source file (typically one month of flights) is parsed and cleaned once
+into its own uncompressed Feather shard; later runs only parse files that
+are new or whose contents changed, and read the rest memory-mapped.
+
+Shards keep carriers as raw codes, since the label encoding depends on every
+partition's carriers; create_model.py encodes them when it combines shards.
+
+A manifest.json in the shard directory records the content hash and row count
+of every shard. Requires pyarrow.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from feature_cache import TARGET_COLUMN, file_hash
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+# Bump whenever cleaning or feature engineering changes what gets stored
+SHARD_VERSION = 1
+
+MANIFEST = 'manifest.json'
+
+
+def list_partitions(source_dir):
+    """Partition names and paths of the CSV files in source_dir, in name order."""
+    return [
+        (os.path.splitext(name)[0], os.path.join(source_dir, name))
+        for name in sorted(os.listdir(source_dir))
+        if name.endswith('.csv')
+    ]
+
+
+def _paths(shard_dir, name):
+    return (
+        os.path.join(shard_dir, f'{name}.features.feather'),
+        os.path.join(shard_dir, f'{name}.airports.feather'),
+    )
+
+
+def _read_manifest(shard_dir):
+    path = os.path.join(shard_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        manifest = json.load(f)
+    # Shards written by other cleaning code are rebuilt
+    return manifest['partitions'] if manifest.get('version') == SHARD_VERSION else {}
+
+
+def _write_manifest(shard_dir, partitions):
+    path = os.path.join(shard_dir, MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'version': SHARD_VERSION, 'partitions': partitions}, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def sync_shards(source_dir, shard_dir, build_partition):
+    """
+    Bring the shards in line with the CSV files in source_dir.
+
+    Args:
+        source_dir: Directory with one CSV file per partition
+        shard_dir: Directory holding the shards and their manifest
+        build_partition: Function from a CSV path to (features, y, airports),
+            features holding the raw Carrier column
+
+    Returns:
+        Dict of partition name -> {'hash', 'rows'} for every file in source_dir
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest = _read_manifest(shard_dir)
+    partitions = {}
+
+    for name, path in list_partitions(source_dir):
+        digest = file_hash(path)
+        if manifest.get(name, {}).get('hash') == digest:
+            partitions[name] = manifest[name]
+            print(f"  {name}: cached shard ({manifest[name]['rows']:,} rows)")
+            continue
+
+        features, y, airports = build_partition(path)
+        table = features.reset_index(drop=True)
+        table[TARGET_COLUMN] = y.reset_index(drop=True)
+        features_path, airports_path = _paths(shard_dir, name)
+        feather.write_feather(table, features_path, compression='uncompressed')
+        feather.write_feather(airports.reset_index(drop=True), airports_path, compression='uncompressed')
+
+        partitions[name] = {'hash': digest, 'rows': len(table)}
+        # Recorded as each shard completes, so an interrupted run keeps its progress
+        manifest[name] = partitions[name]
+        _write_manifest(shard_dir, manifest)
+        print(f"  {name}: parsed {path} ({len(table):,} rows)")
+
+    # Files that were removed from source_dir no longer count
+    _write_manifest(shard_dir, partitions)
+    return partitions
+
+
+def load_shards(shard_dir, names):
+    """
+    Concatenate the shards of the given partitions, memory-mapping each one.
+
+    Returns:
+        Tuple of (features with raw Carrier column, y, airports with the first
+        name seen per airport ID, sorted by ID)
+    """
+    tables = []
+    airports = []
+    for name in names:
+        features_path, airports_path = _paths(shard_dir, name)
+        tables.append(feather.read_table(features_path, memory_map=True).to_pandas(split_blocks=True))
+        airports.append(feather.read_table(airports_path).to_pandas())
+
+    table = pd.concat(tables, ignore_index=True)
+    # Categories differ between shards; compare and encode carriers as strings
+    table['Carrier'] = table['Carrier'].astype(str)
+    airports = pd.concat(airports).drop_duplicates('AirportID').sort_values('AirportID')
+    return table.drop(columns=TARGET_COLUMN), table[TARGET_COLUMN], airports
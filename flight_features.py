@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Flight Features
+===============
+
+Builds the model's feature matrix from raw flight fields, shared by training
+(create_model.py), the command line tool (use_model.py) and the API
+(backend/main.py) so every caller encodes flights the same way.
+
+Categorical values are encoded through dicts precomputed from the fitted
+label encoders. This gives the same codes as LabelEncoder.transform without
+scanning classes_ or allocating arrays on every call. Large inputs, such as
+whole flight schedules, are encoded with one vectorized pandas Categorical
+lookup instead.
+
+pandas is only imported when it is needed: for large encodes, flight tables
+and DataFrame model input. A builder made with as_frame=False for the compiled
+engine, with encoder classes from label_classes.json, serves the API on NumPy
+alone.
+"""
+
+import json
+import os
+
+import numpy as np
+
+FEATURE_COLUMNS = [
+    'Month', 'DayofMonth', 'DayOfWeek',
+    'OriginAirportID', 'DestAirportID',
+    'CRSDepTime_Hour', 'CRSArrTime_Hour',
+    'Carrier'
+]
+
+# Raw flight columns, as in the training data, that FeatureBuilder.build_from_flights reads
+FLIGHT_COLUMNS = [
+    'Month', 'DayofMonth', 'DayOfWeek',
+    'OriginAirportID', 'DestAirportID',
+    'CRSDepTime', 'CRSArrTime',
+    'Carrier'
+]
+
+# Code returned by FeatureBuilder.encode for values not seen in training
+UNKNOWN_CODE = -1
+
+# Up to this many values, dict lookups beat the setup cost of a pandas Categorical
+DICT_ENCODE_MAX_ROWS = 64
+
+# Encoder classes by column as JSON, readable without sklearn
+LABEL_CLASSES = 'label_classes.json'
+LABEL_ENCODERS = 'label_encoders.pkl'
+
+
+def scheduled_hour(hhmm):
+    """Hour of day from scheduled times stored as HHMM (e.g. 1435 -> 14)."""
+    return hhmm // 100
+
+
+def save_label_classes(label_encoders, models_dir):
+    """Write the fitted encoders' classes as label_classes.json."""
+    with open(os.path.join(models_dir, LABEL_CLASSES), 'w') as f:
+        json.dump({column: encoder.classes_.tolist() for column, encoder in label_encoders.items()}, f)
+
+
+def load_label_classes(models_dir):
+    """
+    Encoder classes by column from label_classes.json, or from the pickled
+    LabelEncoders (importing joblib and sklearn) for models saved before it existed.
+    """
+    path = os.path.join(models_dir, LABEL_CLASSES)
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+
+    import joblib
+    label_encoders = joblib.load(os.path.join(models_dir, LABEL_ENCODERS))
+    return {column: encoder.classes_.tolist() for column, encoder in label_encoders.items()}
+
+
+class FeatureBuilder:
+    """Encodes raw flight fields into model input rows."""
+
+    def __init__(self, label_encoders, feature_columns=FEATURE_COLUMNS, defaults=None, as_frame=True):
+        """
+        Args:
+            label_encoders: Fitted LabelEncoders, or their sorted classes, by column name
+            feature_columns: Model input columns, in order
+            defaults: Encoded values for columns a caller may leave out
+            as_frame: Build model input as DataFrames (for sklearn models) rather
+                than 2-D arrays in column order (for the compiled forest)
+        """
+        self.feature_columns = list(feature_columns)
+        self.defaults = dict(defaults or {})
+        self.as_frame = as_frame
+        self.classes = {
+            column: encoder.classes_.tolist() if hasattr(encoder, 'classes_') else list(encoder)
+            for column, encoder in label_encoders.items()
+        }
+        self.codes = {
+            column: {value: code for code, value in enumerate(classes)}
+            for column, classes in self.classes.items()
+        }
+        self._categories = None
+
+    @property
+    def categories(self):
+        """Encoder classes as pandas Indexes, by column."""
+        if self._categories is None:
+            import pandas as pd
+            self._categories = {column: pd.Index(classes) for column, classes in self.classes.items()}
+        return self._categories
+
+    def encode(self, column, values, unknown=UNKNOWN_CODE):
+        """Label-encoded codes for raw categorical values; unseen values get `unknown`."""
+        if len(values) <= DICT_ENCODE_MAX_ROWS:
+            codes = self.codes[column]
+            return np.fromiter((codes.get(value, unknown) for value in values), dtype=np.int64, count=len(values))
+
+        import pandas as pd
+        # classes_ is sorted, so category positions are the LabelEncoder codes
+        codes = pd.Categorical(values, categories=self.categories[column]).codes.astype(np.int64)
+        codes[codes == -1] = unknown
+        return codes
+
+    def build_from_flights(self, flights, unknown=UNKNOWN_CODE):
+        """
+        Model input DataFrame from raw flight records with the training data's
+        columns (CRSDepTime/CRSArrTime as HHMM, Carrier as a code like 'AA').
+
+        Missing values are treated as 0, like the training data cleaning;
+        carriers not seen in training get `unknown`.
+        """
+        flights = flights[FLIGHT_COLUMNS].fillna(0)
+        values = {
+            'Month': flights['Month'].to_numpy(),
+            'DayofMonth': flights['DayofMonth'].to_numpy(),
+            'DayOfWeek': flights['DayOfWeek'].to_numpy(),
+            'OriginAirportID': flights['OriginAirportID'].to_numpy(),
+            'DestAirportID': flights['DestAirportID'].to_numpy(),
+            'CRSDepTime_Hour': scheduled_hour(flights['CRSDepTime'].to_numpy()),
+            'CRSArrTime_Hour': scheduled_hour(flights['CRSArrTime'].to_numpy()),
+            'Carrier': self.encode('Carrier', flights['Carrier'].to_numpy(), unknown)
+        }
+        return self.build(len(flights), values)
+
+    def build(self, n_rows, values):
+        """
+        Model input for n_rows flights: a DataFrame, or a 2-D array in column
+        order when the builder was made with as_frame=False.
+
+        Args:
+            n_rows: Number of flights
+            values: Encoded values by feature column, either an array of n_rows
+                values or one value for every row; missing columns take the defaults
+        """
+        data = {}
+        for column in self.feature_columns:
+            value = values[column] if column in values else self.defaults[column]
+            if np.ndim(value) == 0:
+                data[column] = np.full(n_rows, value)
+            else:
+                data[column] = np.asarray(value)
+        if not self.as_frame:
+            return np.column_stack(list(data.values()))
+
+        import pandas as pd
+        return pd.DataFrame(data)
+
+    def build_rows(self, rows):
+        """Model input from complete encoded feature rows, such as those returned by row()."""
+        matrix = np.array(rows)
+        if not self.as_frame:
+            return matrix
+
+        import pandas as pd
+        return pd.DataFrame(matrix, columns=self.feature_columns)
+
+    def row(self, values):
+        """One flight's complete encoded feature vector as a tuple, in column order."""
+        return tuple(
+            values[column] if column in values else self.defaults[column]
+            for column in self.feature_columns
+        )
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Compiled Forest Inference Engine
+================================
+
+Exports a fitted scikit-learn RandomForestClassifier into flat NumPy node arrays
+and scores it with vectorized, level-by-level traversal of all trees at once.
+Probabilities are bit-identical to RandomForestClassifier.predict_proba: inputs
+are compared as float32 like sklearn's tree code, and per-tree probabilities
+are summed in tree order before dividing by the number of trees.
+
+Select it with FLIGHT_DELAY_INFERENCE_ENGINE=compiled (default: sklearn).
+The engine is for single-row latency, where it avoids sklearn's per-call
+overhead. On large batches sklearn's compiled tree traversal wins (10k rows
+take about 2-3x longer here), so bulk scoring keeps sklearn by default.
+
+The compiled arrays can also be saved as a versioned directory of .npy files
+that loads with read-only memory mapping: cold start skips unpickling, and
+every worker process maps the same physical pages. Each save writes a new
+numbered directory (flight_delay_model_arrays.N) and then atomically points
+the flight_delay_model_arrays symlink at it. The manifest records the SHA-256
+of the pickle the arrays were compiled from, and arrays whose pickle has since
+changed are ignored in favour of compiling the pickle.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_ENGINES = ('sklearn', 'compiled')
+
+# Array artifact layout; bump when the files or their meaning change
+ARRAY_FORMAT_VERSION = 2
+ARRAY_FIELDS = ('feature', 'threshold', 'children', 'leaf_proba', 'roots', 'classes')
+MODEL_PICKLE = 'flight_delay_model.pkl'
+MODEL_ARRAYS = 'flight_delay_model_arrays'
+MODEL_INFO = 'model_info.json'
+
+# Rows traversed together; keeps the (n_trees, n_rows) working set cache-sized
+BATCH_CHUNK_ROWS = 1024
+
+
+def _sklearn_version():
+    import sklearn
+    return tuple(int(part) for part in sklearn.__version__.split('.')[:2])
+
+
+class CompiledForest:
+    """
+    Drop-in replacement for RandomForestClassifier.predict_proba/predict.
+
+    All trees are concatenated into flat node arrays. Children are global node
+    indices stored as (left, right) pairs, and leaves point to themselves, so
+    every tree can be advanced one level per step without special-casing leaves.
+    """
+
+    def __init__(self, feature, threshold, children, leaf_proba, roots, max_depth,
+                 classes, feature_names=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+        self.feature_names_in_ = None if feature_names is None else np.asarray(feature_names)
+        self.n_estimators = len(roots)
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Export a fitted RandomForestClassifier (single output, no missing values)."""
+        if forest.n_outputs_ != 1:
+            raise ValueError("Only single-output forests can be compiled")
+
+        # Before sklearn 1.4, tree values held weighted counts that
+        # DecisionTreeClassifier.predict_proba normalized per sample
+        normalize = _sklearn_version() < (1, 4)
+        n_classes = forest.n_classes_
+
+        features, thresholds, lefts, rights, probas, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+
+            proba = tree.value[:, 0, :n_classes].astype(np.float64)
+            if normalize:
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                proba = proba / normalizer
+            probas.append(proba)
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.stack(
+                [np.concatenate(lefts), np.concatenate(rights)], axis=1
+            ).ravel().astype(np.intp),
+            leaf_proba=np.concatenate(probas),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            classes=forest.classes_,
+            feature_names=getattr(forest, 'feature_names_in_', None),
+        )
+
+    def _as_matrix(self, X):
+        """Convert input rows to the float32 matrix sklearn's trees compare against."""
+        if hasattr(X, 'columns') and self.feature_names_in_ is not None:
+            X = X[list(self.feature_names_in_)]
+        return np.asarray(X, dtype=np.float32)
+
+    def _leaves(self, X):
+        """Leaf node per (tree, row), shape (n_trees, n_rows)."""
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = np.arange(n_rows, dtype=np.intp) * n_features
+
+        nodes = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            go_right = flat_X[row_offsets + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_right]
+        return nodes
+
+    def _leaves_one(self, x):
+        """Leaf node per tree for a single row, shape (n_trees,)."""
+        nodes = self.roots
+        for _ in range(self.max_depth):
+            nodes = self.children[2 * nodes + (x[self.feature[nodes]] > self.threshold[nodes])]
+        return nodes
+
+    def _average(self, leaf_values):
+        """Sum per-tree probabilities in tree order, then average, like sklearn."""
+        proba = np.zeros(leaf_values.shape[1:], dtype=np.float64)
+        for tree_values in leaf_values:
+            proba += tree_values
+        proba /= self.n_estimators
+        return proba
+
+    def predict_proba(self, X):
+        """Class probabilities, shape (n_rows, n_classes)."""
+        X = self._as_matrix(X)
+        if X.shape[0] == 1:
+            return self.predict_proba_one(X[0])[np.newaxis, :]
+        proba = np.empty((X.shape[0], self.leaf_proba.shape[1]), dtype=np.float64)
+        for start in range(0, X.shape[0], BATCH_CHUNK_ROWS):
+            chunk = X[start:start + BATCH_CHUNK_ROWS]
+            proba[start:start + len(chunk)] = self._average(self.leaf_proba[self._leaves(chunk)])
+        return proba
+
+    def predict_proba_one(self, x):
+        """Class probabilities for a single feature row, shape (n_classes,)."""
+        x = np.asarray(x, dtype=np.float32)
+        return self._average(self.leaf_proba[self._leaves_one(x)][:, np.newaxis, :])[0]
+
+    def predict(self, X):
+        """Predicted class labels, matching RandomForestClassifier.predict."""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def model_fingerprint(path):
+    """SHA-256 of a pickled model file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _array_versions(directory):
+    """Numbered directories written by save_compiled_forest, oldest first."""
+    parent, name = os.path.split(directory)
+    versions = []
+    for entry in os.listdir(parent or '.'):
+        prefix, _, number = entry.rpartition('.')
+        if prefix == name and number.isdigit():
+            versions.append((int(number), os.path.join(parent, entry)))
+    return sorted(versions)
+
+
+def save_compiled_forest(forest, directory, fingerprint=None):
+    """
+    Write a CompiledForest as one .npy file per array plus a manifest.json.
+
+    The arrays go to a new numbered directory, and directory becomes a symlink
+    to it in a single rename, so readers see either the old or the new arrays
+    and never a mix. The previous version is kept for readers that resolved
+    the link just before the swap; older ones are removed.
+
+    Args:
+        fingerprint: model_fingerprint of the pickle the forest was compiled
+            from, checked by load_model
+    """
+    versions = _array_versions(directory)
+    version_dir = f'{directory}.{versions[-1][0] + 1 if versions else 1}'
+    os.makedirs(version_dir)
+
+    arrays = {
+        'feature': forest.feature,
+        'threshold': forest.threshold,
+        'children': forest.children,
+        'leaf_proba': forest.leaf_proba,
+        'roots': forest.roots,
+        'classes': forest.classes_,
+    }
+    for field in ARRAY_FIELDS:
+        np.save(os.path.join(version_dir, f'{field}.npy'), arrays[field])
+
+    manifest = {
+        'format': 'compiled_forest',
+        'version': ARRAY_FORMAT_VERSION,
+        'n_estimators': int(forest.n_estimators),
+        'max_depth': forest.max_depth,
+        'feature_names': None if forest.feature_names_in_ is None else list(forest.feature_names_in_),
+        'model_fingerprint': fingerprint,
+    }
+    with open(os.path.join(version_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    link = directory + '.swap'
+    if os.path.lexists(link):
+        os.remove(link)
+    # Relative, so the models directory can be moved or copied as a whole
+    os.symlink(os.path.basename(version_dir), link)
+    if os.path.isdir(directory) and not os.path.islink(directory):
+        # A plain directory from before versioning; until the link replaces it,
+        # load_model compiles the pickle instead
+        shutil.rmtree(f'{directory}.0', ignore_errors=True)
+        os.replace(directory, f'{directory}.0')
+    os.replace(link, directory)
+
+    for _, old_dir in _array_versions(directory)[:-2]:
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def remove_compiled_forest(directory):
+    """Remove the arrays written by save_compiled_forest, with every version."""
+    if os.path.islink(directory):
+        os.remove(directory)
+    else:
+        shutil.rmtree(directory, ignore_errors=True)
+    for _, version_dir in _array_versions(directory):
+        shutil.rmtree(version_dir, ignore_errors=True)
+
+
+def load_compiled_forest(directory, mmap=True, fingerprint=None):
+    """
+    Load a forest written by save_compiled_forest, memory-mapped read-only by default.
+
+    With a fingerprint, arrays compiled from another pickle raise ValueError.
+    """
+    # Resolve the link once, so a concurrent save cannot swap versions mid-load
+    directory = os.path.realpath(directory)
+    with open(os.path.join(directory, 'manifest.json')) as f:
+        manifest = json.load(f)
+    if manifest.get('format') != 'compiled_forest' or manifest.get('version') != ARRAY_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported model array format {manifest.get('format')!r} "
+            f"version {manifest.get('version')!r} in {directory}"
+        )
+    if fingerprint is not None and manifest['model_fingerprint'] != fingerprint:
+        raise ValueError(f"{directory} was compiled from a different {MODEL_PICKLE}")
+
+    arrays = {}
+    for field in ARRAY_FIELDS:
+        array = np.load(
+            os.path.join(directory, f'{field}.npy'),
+            mmap_mode='r' if mmap else None, allow_pickle=False
+        )
+        # Plain ndarray views keep the mapping without np.memmap's per-op overhead
+        arrays[field] = array.view(np.ndarray)
+
+    return CompiledForest(
+        feature=arrays['feature'],
+        threshold=arrays['threshold'],
+        children=arrays['children'],
+        leaf_proba=arrays['leaf_proba'],
+        roots=arrays['roots'],
+        max_depth=manifest['max_depth'],
+        classes=arrays['classes'],
+        feature_names=manifest['feature_names'],
+    )
+
+
+def model_type(models_dir):
+    """Model family recorded by create_model.py; older artifacts are random forests."""
+    info_path = os.path.join(models_dir, MODEL_INFO)
+    if not os.path.exists(info_path):
+        return 'random_forest'
+    with open(info_path) as f:
+        return json.load(f).get('model_type', 'random_forest')
+
+
+def load_model(models_dir, engine):
+    """
+    Load the model for an inference engine.
+
+    The compiled engine prefers the memory-mapped array artifact and falls back
+    to compiling the pickled forest if it is missing, from another version or
+    compiled from another pickle.
+    Models other than random forests are always served by sklearn.
+
+    Returns:
+        Tuple of (model, path of the artifact it was loaded from)
+    """
+    if engine == 'compiled' and model_type(models_dir) != 'random_forest':
+        logger.warning(f"{model_type(models_dir)} models cannot be compiled; using sklearn")
+        engine = 'sklearn'
+
+    arrays_path = os.path.join(models_dir, MODEL_ARRAYS)
+    pickle_path = os.path.join(models_dir, MODEL_PICKLE)
+    if engine == 'compiled' and os.path.exists(os.path.join(arrays_path, 'manifest.json')):
+        # Without the pickle there is nothing to check against or fall back to
+        fingerprint = model_fingerprint(pickle_path) if os.path.exists(pickle_path) else None
+        try:
+            return (load_compiled_forest(arrays_path, fingerprint=fingerprint),
+                    os.path.join(arrays_path, 'manifest.json'))
+        except ValueError as e:
+            logger.warning(f"{e}; compiling {MODEL_PICKLE} instead")
+
+    import joblib
+    return prepare_model(joblib.load(pickle_path), engine), pickle_path
+
+
+def inference_engine_from_env():
+    """Inference engine named by FLIGHT_DELAY_INFERENCE_ENGINE."""
+    engine = os.environ.get('FLIGHT_DELAY_INFERENCE_ENGINE', 'sklearn')
+    if engine not in INFERENCE_ENGINES:
+        raise ValueError(
+            f"FLIGHT_DELAY_INFERENCE_ENGINE must be one of {INFERENCE_ENGINES}, got {engine!r}"
+        )
+    return engine
+
+
+def takes_arrays(model):
+    """Whether a model scores plain 2-D arrays; fitted sklearn models expect DataFrames with feature names."""
+    return isinstance(model, CompiledForest)
+
+
+def prepare_model(model, engine):
+    """Wrap a fitted forest for the requested inference engine."""
+    if engine == 'compiled':
+        return CompiledForest.from_sklearn(model)
+    return model
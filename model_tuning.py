@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Flight Delay Model Tuning
+=========================
+
+Grid or random search over RandomForest parameters with stratified k-fold
+cross-validation, run on a process pool. The training matrix is written once
+to .npy files that every worker memory-maps read-only, instead of pickling
+it into each task.
+
+Each configuration is reported with its AUC, training time and inference
+latency, and the latency/accuracy Pareto frontier is marked, so models can be
+chosen on both axes rather than on accuracy alone.
+"""
+
+import itertools
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+DEFAULT_PARAM_GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [8, 10, 14],
+    'min_samples_split': [100, 500],
+}
+
+# Rows scored one at a time to estimate single-row latency
+LATENCY_SAMPLE_ROWS = 50
+
+# Worker state, populated once per process by _init_worker
+_X = None
+_y = None
+_folds = None
+
+
+def _init_worker(X_path, y_path, n_folds, random_state):
+    """Memory-map the shared training data and compute the CV folds."""
+    global _X, _y, _folds
+    _X = np.load(X_path, mmap_mode='r')
+    _y = np.load(y_path, mmap_mode='r')
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state)
+    _folds = list(splitter.split(np.zeros(len(_y)), _y))
+
+
+def _evaluate(params, fold, random_state):
+    """Fit one configuration on one fold and time training and inference."""
+    train_idx, test_idx = _folds[fold]
+    model = RandomForestClassifier(random_state=random_state, n_jobs=1, **params)
+
+    start = time.perf_counter()
+    model.fit(_X[train_idx], _y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    X_test = _X[test_idx]
+    start = time.perf_counter()
+    proba = model.predict_proba(X_test)[:, 1]
+    batch_seconds = time.perf_counter() - start
+
+    sample = X_test[:LATENCY_SAMPLE_ROWS]
+    start = time.perf_counter()
+    for row in sample:
+        model.predict_proba(row[np.newaxis, :])
+    single_row_ms = (time.perf_counter() - start) * 1000 / len(sample)
+
+    return {
+        'auc': roc_auc_score(_y[test_idx], proba),
+        'fit_seconds': fit_seconds,
+        'batch_us_per_row': batch_seconds * 1e6 / len(test_idx),
+        'single_row_ms': single_row_ms,
+    }
+
+
+def candidate_configs(param_grid, n_samples=0, random_state=42):
+    """All grid configurations, or n_samples of them drawn at random."""
+    names = sorted(param_grid)
+    configs = [dict(zip(names, values)) for values in itertools.product(*(param_grid[n] for n in names))]
+    if n_samples and n_samples < len(configs):
+        configs = random.Random(random_state).sample(configs, n_samples)
+    return configs
+
+
+def pareto_frontier(results):
+    """Indices of results not beaten on both AUC (higher) and single-row latency (lower)."""
+    frontier = []
+    for i, r in enumerate(results):
+        dominated = any(
+            o['auc'] >= r['auc'] and o['single_row_ms'] <= r['single_row_ms']
+            and (o['auc'] > r['auc'] or o['single_row_ms'] < r['single_row_ms'])
+            for o in results
+        )
+        if not dominated:
+            frontier.append(i)
+    return frontier
+
+
+def tune(X, y, param_grid=None, n_samples=0, n_folds=5, n_workers=None, random_state=42):
+    """
+    Cross-validate every candidate configuration in parallel.
+
+    Returns:
+        List of per-configuration results (mean and std AUC, timings,
+        frontier flag), sorted by mean AUC, best first
+    """
+    configs = candidate_configs(param_grid or DEFAULT_PARAM_GRID, n_samples, random_state)
+    print(f"\nTuning {len(configs)} configurations with {n_folds}-fold stratified CV...")
+
+    with tempfile.TemporaryDirectory(prefix='flight-delay-tuning-') as tmp_dir:
+        X_path = os.path.join(tmp_dir, 'X.npy')
+        y_path = os.path.join(tmp_dir, 'y.npy')
+        np.save(X_path, np.ascontiguousarray(X, dtype=np.float32))
+        np.save(y_path, np.asarray(y))
+
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_worker,
+            initargs=(X_path, y_path, n_folds, random_state),
+        ) as pool:
+            futures = {
+                (i, fold): pool.submit(_evaluate, config, fold, random_state)
+                for i, config in enumerate(configs)
+                for fold in range(n_folds)
+            }
+            fold_results = {key: future.result() for key, future in futures.items()}
+
+    results = []
+    for i, config in enumerate(configs):
+        folds = [fold_results[(i, fold)] for fold in range(n_folds)]
+        aucs = [f['auc'] for f in folds]
+        results.append({
+            'params': config,
+            'auc': float(np.mean(aucs)),
+            'auc_std': float(np.std(aucs)),
+            'fit_seconds': float(np.mean([f['fit_seconds'] for f in folds])),
+            'batch_us_per_row': float(np.mean([f['batch_us_per_row'] for f in folds])),
+            'single_row_ms': float(np.median([f['single_row_ms'] for f in folds])),
+        })
+
+    for i in pareto_frontier(results):
+        results[i]['frontier'] = True
+    results.sort(key=lambda r: r['auc'], reverse=True)
+    return results
+
+
+def select_config(results, max_latency_ms=None):
+    """Best-AUC configuration, optionally within a single-row latency budget."""
+    candidates = [
+        r for r in results
+        if max_latency_ms is None or r['single_row_ms'] <= max_latency_ms
+    ]
+    if not candidates:
+        raise ValueError(f"No configuration scores a single row within {max_latency_ms} ms")
+    return max(candidates, key=lambda r: r['auc'])
+
+
+def print_report(results):
+    """Print the tuning results as a table."""
+    print(f"\n{'AUC':>14} {'fit s':>8} {'µs/row':>8} {'1-row ms':>9}  params")
+    for r in results:
+        marker = '*' if r.get('frontier') else ' '
+        params = ', '.join(f"{k}={v}" for k, v in sorted(r['params'].items()))
+        print(
+            f"{marker} {r['auc']:.4f}±{r['auc_std']:.4f} {r['fit_seconds']:>8.1f} "
+            f"{r['batch_us_per_row']:>8.2f} {r['single_row_ms']:>9.2f}  {params}"
+        )
+    print("\n* = on the AUC / single-row latency frontier")
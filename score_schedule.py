@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Flight Delay Bulk Scoring
+=========================
+
+Scores a whole flight schedule with the trained model. The schedule is read
+in chunks from CSV or Parquet, each chunk is encoded and scored on a process
+pool, and results are appended to the output file in input order as soon as
+they are ready. Memory stays bounded by the chunk size and the number of
+chunks in flight, whatever the size of the schedule.
+
+The schedule needs the training data's flight columns (Month, DayofMonth,
+DayOfWeek, OriginAirportID, DestAirportID, CRSDepTime, CRSArrTime, Carrier).
+Every input column is copied to the output, followed by delay_probability and
+prediction (1 = likely delayed). In Parquet output the flight columns other
+than Carrier are nullable int64; blank values, and any that are not whole
+numbers (reported in a warning), are written as null.
+
+Usage:
+    python score_schedule.py schedule.csv scored.csv
+    python score_schedule.py schedule.parquet scored.parquet --workers 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from flight_features import FLIGHT_COLUMNS, FeatureBuilder
+from forest_engine import INFERENCE_ENGINES, load_model as load_forest
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Worker state, populated once per process by _init_worker
+_model = None
+_feature_builder = None
+
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Score a flight schedule with the trained delay model.")
+    parser.add_argument('input', help="Schedule to score (.csv or .parquet)")
+    parser.add_argument('output', help="File to write (.csv or .parquet)")
+    parser.add_argument('--models-dir', default='models', help="Directory with the trained model (default: models)")
+    # Not FLIGHT_DELAY_INFERENCE_ENGINE: the compiled engine only speeds up
+    # single rows, and is slower than sklearn on whole chunks
+    parser.add_argument('--engine', choices=INFERENCE_ENGINES, default='sklearn',
+                        help="Inference engine (default: sklearn)")
+    parser.add_argument('--chunk-size', type=int, default=100_000, help="Rows per chunk (default: 100,000)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Scoring processes; 0 scores in this process (default: CPU count)")
+    return parser.parse_args()
+
+
+def load_scorer(models_dir, engine):
+    """Model and feature builder for scoring, restricted to one thread."""
+    model, _ = load_forest(models_dir, engine)
+    # Parallelism comes from the process pool; threads per process would oversubscribe
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = 1
+    label_encoders = joblib.load(os.path.join(models_dir, 'label_encoders.pkl'))
+    with open(os.path.join(models_dir, 'feature_columns.json')) as f:
+        feature_columns = json.load(f)
+    return model, FeatureBuilder(label_encoders, feature_columns)
+
+
+def _init_worker(models_dir, engine):
+    """Load the model once per process."""
+    global _model, _feature_builder
+    _model, _feature_builder = load_scorer(models_dir, engine)
+
+
+def _score_chunk(flights):
+    """Delay probabilities, predictions and the unknown carrier count for a chunk."""
+    X = _feature_builder.build_from_flights(flights, unknown=0)
+    unknown = int((~flights['Carrier'].isin(_feature_builder.categories['Carrier'])).sum())
+    proba = _model.predict_proba(X)
+    prediction = _model.classes_.take(np.argmax(proba, axis=1))
+    return proba[:, 1], prediction, unknown
+
+
+def read_chunks(path, chunk_size):
+    """Yield the schedule as DataFrames of at most chunk_size rows."""
+    if path.endswith('.parquet'):
+        if pq is None:
+            sys.exit("Reading Parquet requires pyarrow (pip install pyarrow)")
+        chunks = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size))
+    else:
+        chunks = pd.read_csv(path, chunksize=chunk_size)
+
+    for chunk in chunks:
+        missing = [column for column in FLIGHT_COLUMNS if column not in chunk.columns]
+        if missing:
+            sys.exit(f"Schedule is missing columns: {', '.join(missing)}")
+        yield chunk
+
+
+# Flight columns written to Parquet as (nullable) int64
+INTEGER_COLUMNS = [column for column in FLIGHT_COLUMNS if column != 'Carrier']
+
+
+def integer_values(values):
+    """
+    Values as nullable integers: blanks stay missing, and anything that is not
+    a whole number (fractions, text) becomes missing too.
+
+    Returns:
+        Tuple of (Int64 Series, number of non-blank values that became missing)
+    """
+    numbers = pd.to_numeric(values, errors='coerce')
+    numbers = numbers.where(numbers % 1 == 0)
+    return numbers.astype('Int64'), int(numbers.isna().sum() - values.isna().sum())
+
+
+def output_schema(table):
+    """
+    Parquet schema for the whole output, from the first scored chunk.
+
+    Flight columns (nullable int64, Carrier as text) and delay_probability
+    get fixed types. Other input columns
+    keep the type of the first chunk, except that integers are widened to
+    float64 and columns with no values yet become strings: pandas infers
+    types per chunk, so a later chunk may hold gaps, fractions or text in them.
+    """
+    known = {column: pa.int64() for column in FLIGHT_COLUMNS}
+    known['Carrier'] = pa.string()
+    known['delay_probability'] = pa.float64()
+
+    fields = []
+    for field, column in zip(table.schema, table.columns):
+        if field.name in known:
+            field_type = known[field.name]
+        elif column.null_count == len(column):
+            field_type = pa.string()
+        elif pa.types.is_integer(field.type):
+            field_type = pa.float64()
+        else:
+            field_type = field.type
+        fields.append(pa.field(field.name, field_type))
+    return pa.schema(fields)
+
+
+class ResultWriter:
+    """Appends scored chunks to a CSV or Parquet file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        if self.parquet and pq is None:
+            sys.exit("Writing Parquet requires pyarrow (pip install pyarrow)")
+        self._writer = None
+        self._header = True
+        # Flight column values that could not be written as integers
+        self.invalid_values = 0
+
+    def write(self, chunk):
+        if self.parquet:
+            # Every later chunk must fit the int64 flight columns, or the run would stop halfway
+            columns = {}
+            for column in INTEGER_COLUMNS:
+                columns[column], invalid = integer_values(chunk[column])
+                self.invalid_values += invalid
+            table = pa.Table.from_pandas(chunk.assign(**columns), preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, output_schema(table))
+            # Missing values arrive as NaN in float columns and become nulls here
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            chunk.to_csv(self.path, mode='w' if self._header else 'a', header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def score_schedule(args):
+    """
+    Stream, score and write the schedule.
+
+    Returns:
+        Tuple of (rows scored, rows with unknown carriers, flight values written
+        as null because they are not whole numbers, seconds elapsed)
+    """
+    engine = args.engine
+    writer = ResultWriter(args.output)
+    rows = 0
+    unknown_carriers = 0
+    start = time.perf_counter()
+
+    def finish(chunk, result):
+        nonlocal rows, unknown_carriers
+        probability, prediction, unknown = result
+        chunk = chunk.assign(delay_probability=probability, prediction=prediction)
+        writer.write(chunk)
+        rows += len(chunk)
+        unknown_carriers += unknown
+        elapsed = time.perf_counter() - start
+        print(f"  Scored {rows:,} rows ({rows / elapsed:,.0f} rows/sec)")
+
+    try:
+        if args.workers == 0:
+            _init_worker(args.models_dir, engine)
+            for chunk in read_chunks(args.input, args.chunk_size):
+                finish(chunk, _score_chunk(chunk))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=args.workers, initializer=_init_worker, initargs=(args.models_dir, engine)
+            ) as pool:
+                # Two chunks per worker keep every process busy without buffering the schedule
+                in_flight = deque()
+                for chunk in read_chunks(args.input, args.chunk_size):
+                    in_flight.append((chunk, pool.submit(_score_chunk, chunk)))
+                    if len(in_flight) >= 2 * args.workers:
+                        chunk, future = in_flight.popleft()
+                        finish(chunk, future.result())
+                while in_flight:
+                    chunk, future = in_flight.popleft()
+                    finish(chunk, future.result())
+    finally:
+        writer.close()
+
+    return rows, unknown_carriers, writer.invalid_values, time.perf_counter() - start
+
+
+def main():
+    """Score a schedule from the command line."""
+    args = parse_args()
+
+    print("Flight Delay Bulk Scoring")
+    print("=" * 50)
+    print(f"Scoring {args.input} -> {args.output} "
+          f"({args.workers} workers, chunks of {args.chunk_size:,} rows)")
+
+    if not os.path.exists(os.path.join(args.models_dir, 'label_encoders.pkl')):
+        print("Model not found. Please run create_model.py first.")
+        sys.exit(1)
+
+    rows, unknown_carriers, invalid_values, elapsed = score_schedule(args)
+
+    print(f"\nScored {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+    if unknown_carriers:
+        print(f"Warning: {unknown_carriers:,} rows had carriers unknown to the model and used the default encoding")
+    if invalid_values:
+        print(f"Warning: {invalid_values:,} flight column values were not whole numbers and were written as null")
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
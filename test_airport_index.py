@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Airport index tests
+===================
+
+Round-trips airport tables through airports.csv and the binary index written
+by create_model.py, including airports with blank names, cities or states as
+they come out of both the in-memory cleaning (blanks filled with 0) and the
+streaming loader (blanks left as NaN).
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from airport_index import AIRPORTS_BINARY, AIRPORTS_CSV, load_airport_index, save_airport_binary
+from create_model import AirportCollector
+
+def flights_with_blanks(blank):
+    """Two flights whose airports have one blank city and one blank state."""
+    return pd.DataFrame({
+        'OriginAirportID': [10397, 13930],
+        'OriginAirportName': ['Hartsfield-Jackson Atlanta International', "Chicago O'Hare International"],
+        'OriginCity': ['Atlanta', blank],
+        'OriginState': ['GA', 'IL'],
+        'DestAirportID': [13930, 12892],
+        'DestAirportName': ["Chicago O'Hare International", 'Los Angeles International'],
+        'DestCity': [blank, 'Los Angeles'],
+        'DestState': ['IL', blank],
+    })
+
+def round_trip(airports):
+    """Records read back from airports.csv and from the binary index."""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, AIRPORTS_CSV)
+        binary_path = os.path.join(tmp, AIRPORTS_BINARY)
+        airports.to_csv(csv_path, index=False)
+        save_airport_binary(airports.to_dict('records'), binary_path)
+        from_csv = load_airport_index(csv_path)
+        from_binary = load_airport_index(binary_path)
+    return from_csv, from_binary
+
+def test_blank_fields_after_fillna():
+    """Blanks filled with 0 by clean_data are written like airports.csv writes them."""
+    print("\nTesting blank city and state filled with 0...")
+    airports = AirportCollector()
+    airports.add(flights_with_blanks(0))
+    from_csv, from_binary = round_trip(airports.to_frame())
+
+    assert from_binary.by_id == from_csv.by_id
+    assert from_binary.get(13930)['City'] == '0'
+    assert from_binary.get(12892)['State'] == '0'
+    print("  ✓ Binary index matches airports.csv")
+
+def test_blank_fields_from_streaming():
+    """Blanks left as NaN by the streaming loader are written as empty strings."""
+    print("\nTesting blank city and state left as NaN...")
+    airports = AirportCollector()
+    flights = flights_with_blanks(np.nan).astype({
+        'OriginCity': 'category', 'OriginState': 'category', 'DestCity': 'category', 'DestState': 'category'
+    })
+    airports.add(flights)
+    from_csv, from_binary = round_trip(airports.to_frame())
+
+    assert from_binary.by_id == from_csv.by_id
+    assert from_binary.get(13930)['City'] == ''
+    assert from_binary.get(12892)['State'] == ''
+    assert from_binary.get(10397)['AirportName'] == 'Hartsfield-Jackson Atlanta International'
+    print("  ✓ Binary index matches airports.csv")
+
+if __name__ == "__main__":
+    test_blank_fields_after_fillna()
+    test_blank_fields_from_streaming()
+    print("\n🎉 All tests passed!")
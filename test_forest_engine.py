@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Compiled forest artifact tests
+==============================
+
+Saves compiled forests the way create_model.py does and checks that each save
+swaps the flight_delay_model_arrays link to a new version, and that arrays
+compiled from another pickle are not served.
+"""
+
+import os
+import tempfile
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from forest_engine import (
+    MODEL_ARRAYS, MODEL_PICKLE, CompiledForest, load_model, model_fingerprint, save_compiled_forest
+)
+
+def save_forest(models_dir, seed):
+    """Fit a small forest, pickle it and save its compiled arrays."""
+    rng = np.random.default_rng(seed)
+    X = rng.random((200, 4))
+    y = (X[:, 0] + rng.random(200) > 1).astype(int)
+    forest = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=seed).fit(X, y)
+    pickle_path = os.path.join(models_dir, MODEL_PICKLE)
+    joblib.dump(forest, pickle_path)
+    save_compiled_forest(
+        CompiledForest.from_sklearn(forest), os.path.join(models_dir, MODEL_ARRAYS), model_fingerprint(pickle_path)
+    )
+    return forest, X
+
+def test_save_swaps_versions():
+    """Each save points the link at a new version and keeps only the previous one."""
+    print("\nTesting versioned compiled forest saves...")
+    with tempfile.TemporaryDirectory() as models_dir:
+        for seed in range(3):
+            forest, X = save_forest(models_dir, seed)
+
+        link = os.path.join(models_dir, MODEL_ARRAYS)
+        assert os.readlink(link) == f'{MODEL_ARRAYS}.3', f"link points at {os.readlink(link)}"
+        assert sorted(os.listdir(models_dir)) == [MODEL_PICKLE, MODEL_ARRAYS, f'{MODEL_ARRAYS}.2', f'{MODEL_ARRAYS}.3']
+
+        model, path = load_model(models_dir, 'compiled')
+        assert path == os.path.join(link, 'manifest.json'), f"loaded from {path}"
+        assert np.array_equal(model.predict_proba(X), forest.predict_proba(X)), "arrays are not the latest forest"
+    print("  ✓ Link swapped to the newest of two kept versions")
+
+def test_stale_arrays_not_served():
+    """Arrays compiled from an older pickle are ignored in favour of the pickle."""
+    print("\nTesting arrays compiled from another pickle...")
+    with tempfile.TemporaryDirectory() as models_dir:
+        save_forest(models_dir, 0)
+        # A newer pickle written without new arrays, e.g. by an interrupted save
+        rng = np.random.default_rng(1)
+        X = rng.random((200, 4))
+        forest = RandomForestClassifier(n_estimators=5, max_depth=4, random_state=1).fit(X, X[:, 1] > 0.5)
+        joblib.dump(forest, os.path.join(models_dir, MODEL_PICKLE))
+
+        model, path = load_model(models_dir, 'compiled')
+        assert path == os.path.join(models_dir, MODEL_PICKLE), f"loaded from {path}"
+        assert np.array_equal(model.predict_proba(X), forest.predict_proba(X)), "stale arrays were served"
+    print("  ✓ Pickle compiled instead of the stale arrays")
+
+if __name__ == "__main__":
+    test_save_swaps_versions()
+    test_stale_arrays_not_served()
+    print("\n🎉 All tests passed!")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Bulk scoring tests
+==================
+
+Scores small synthetic schedules with score_schedule.py in-process and checks
+that chunked output, including Parquet output whose later chunks infer other
+dtypes than the first, matches scoring the whole schedule at once.
+
+Requires a trained model in models/ (run create_model.py first).
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import score_schedule
+from airport_index import airport_index_path, load_airport_index
+from flight_features import load_label_classes
+
+MODELS_DIR = 'models'
+CHUNK_SIZE = 50
+
+def schedule(n_rows):
+    """A schedule of random flights between known airports, with two extra columns."""
+    rng = np.random.default_rng(0)
+    airport_ids = load_airport_index(airport_index_path(MODELS_DIR)).ids_by_name
+    carriers = load_label_classes(MODELS_DIR)['Carrier']
+    return pd.DataFrame({
+        'Month': rng.integers(1, 13, n_rows),
+        'DayofMonth': rng.integers(1, 29, n_rows),
+        'DayOfWeek': rng.integers(1, 8, n_rows),
+        'OriginAirportID': rng.choice(airport_ids, n_rows),
+        'DestAirportID': rng.choice(airport_ids, n_rows),
+        'CRSDepTime': rng.integers(0, 24, n_rows) * 100,
+        'CRSArrTime': rng.integers(0, 24, n_rows) * 100,
+        'Carrier': rng.choice(carriers, n_rows),
+        'FlightNumber': rng.integers(1, 9999, n_rows),
+        'Remark': [None] * n_rows
+    })
+
+def score(input_path, output_path, chunk_size):
+    """Score a schedule file in this process; returns rows scored and flight values written as null."""
+    args = argparse.Namespace(
+        input=input_path, output=output_path, models_dir=MODELS_DIR,
+        engine='sklearn', chunk_size=chunk_size, workers=0
+    )
+    rows, _, invalid_values, _ = score_schedule.score_schedule(args)
+    return rows, invalid_values
+
+def test_parquet_gaps_in_later_chunk():
+    """Test Parquet output when a later chunk has gaps in integer columns and text in an empty one."""
+    assert score_schedule.pq is not None, "Parquet output requires pyarrow"
+    print("\nTesting Parquet output with gaps in a later chunk...")
+    flights = schedule(4 * CHUNK_SIZE)
+    # The first chunk has complete integers and no remarks; the third has gaps and text
+    gaps = np.arange(2 * CHUNK_SIZE, 2 * CHUNK_SIZE + 5)
+    flights['CRSDepTime'] = flights['CRSDepTime'].astype('float64')
+    flights.loc[gaps, 'CRSDepTime'] = np.nan
+    flights['FlightNumber'] = flights['FlightNumber'].astype('float64')
+    flights.loc[gaps, 'FlightNumber'] = np.nan
+    flights.loc[gaps, 'Remark'] = 'diverted'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'schedule.csv')
+        flights.to_csv(input_path, index=False)
+
+        rows, invalid_values = score(input_path, os.path.join(tmp, 'chunked.parquet'), CHUNK_SIZE)
+        score(input_path, os.path.join(tmp, 'whole.parquet'), len(flights))
+
+        chunked = pd.read_parquet(os.path.join(tmp, 'chunked.parquet'))
+        whole = pd.read_parquet(os.path.join(tmp, 'whole.parquet'))
+
+    assert rows == len(flights) and len(chunked) == len(flights), f"{len(chunked)} of {len(flights)} rows written"
+    assert invalid_values == 0, f"{invalid_values} values written as null"
+    assert np.array_equal(chunked['delay_probability'].to_numpy(), whole['delay_probability'].to_numpy()), \
+        "probabilities differ from scoring in one chunk"
+    assert chunked['CRSDepTime'].isna().sum() == 5 and chunked['FlightNumber'].isna().sum() == 5, \
+        "gaps not kept as nulls"
+    assert (chunked['Remark'] == 'diverted').sum() == 5, "text in a later chunk not kept"
+    print(f"  ✓ {len(chunked)} rows written, gaps kept as nulls, probabilities match")
+
+def test_parquet_flight_column_blanks():
+    """Test Parquet output when a later chunk has blanks and a fraction in the flight columns."""
+    assert score_schedule.pq is not None, "Parquet output requires pyarrow"
+    print("\nTesting Parquet output with blank flight fields in a later chunk...")
+    flights = schedule(3 * CHUNK_SIZE).astype({'Month': 'float64', 'DayOfWeek': 'float64',
+                                               'DestAirportID': 'float64', 'CRSArrTime': 'float64'})
+    later = 2 * CHUNK_SIZE + 1
+    flights.loc[later, ['Month', 'DayOfWeek', 'DestAirportID']] = np.nan
+    flights.loc[later + 1, 'CRSArrTime'] = 1430.5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'schedule.csv')
+        flights.to_csv(input_path, index=False)
+        rows, invalid_values = score(input_path, os.path.join(tmp, 'chunked.parquet'), CHUNK_SIZE)
+        chunked = pd.read_parquet(os.path.join(tmp, 'chunked.parquet'), dtype_backend='numpy_nullable')
+
+    assert rows == len(flights) and len(chunked) == len(flights), f"{len(chunked)} of {len(flights)} rows written"
+    for column in score_schedule.INTEGER_COLUMNS:
+        assert str(chunked[column].dtype) == 'Int64', f"{column} written as {chunked[column].dtype}"
+    assert chunked.loc[later, ['Month', 'DayOfWeek', 'DestAirportID']].isna().all(), "blanks not written as nulls"
+    assert invalid_values == 1 and pd.isna(chunked.loc[later + 1, 'CRSArrTime']), \
+        f"{invalid_values} values written as null, expected the one fraction"
+    assert chunked['Month'].notna().sum() == len(flights) - 1, "values other than the blanks changed"
+    print(f"  ✓ {len(chunked)} rows written, blanks and the fraction written as nulls")
+
+def test_csv_chunks():
+    """Test that chunked CSV output matches scoring the whole schedule at once."""
+    print("\nTesting chunked CSV output...")
+    flights = schedule(3 * CHUNK_SIZE + 7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'schedule.csv')
+        flights.to_csv(input_path, index=False)
+        score(input_path, os.path.join(tmp, 'chunked.csv'), CHUNK_SIZE)
+        score(input_path, os.path.join(tmp, 'whole.csv'), len(flights))
+        chunked = pd.read_csv(os.path.join(tmp, 'chunked.csv'))
+        whole = pd.read_csv(os.path.join(tmp, 'whole.csv'))
+
+    assert chunked.equals(whole), "chunked output differs from scoring in one chunk"
+    print(f"  ✓ {len(chunked)} rows match scoring in one chunk")
+
+def main():
+    """Run all tests."""
+    print("=" * 50)
+    print("Flight Delay Bulk Scoring - Tests")
+    print("=" * 50)
+
+    if not os.path.exists(os.path.join(MODELS_DIR, 'label_encoders.pkl')):
+        print("\nModel not found. Please run create_model.py first.")
+        sys.exit(1)
+
+    test_csv_chunks()
+    test_parquet_gaps_in_later_chunk()
+    test_parquet_flight_column_blanks()
+
+    print("\n🎉 All tests passed!")
+
+if __name__ == "__main__":
+    main()
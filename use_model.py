@@ -10,51 +10,53 @@ import joblib
 import pandas as pd
 import json
 
+from airport_index import airport_index_path, load_airport_index
+from flight_features import FeatureBuilder
+from forest_engine import inference_engine_from_env, load_model as load_forest
+
 def load_model():
     """Load the trained model and associated metadata."""
     try:
-        model = joblib.load('models/flight_delay_model.pkl')
+        model, _ = load_forest('models', inference_engine_from_env())
         label_encoders = joblib.load('models/label_encoders.pkl')
         
         with open('models/feature_columns.json', 'r') as f:
             feature_columns = json.load(f)
             
-        airports_df = pd.read_csv('models/airports.csv')
+        airport_index = load_airport_index(airport_index_path('models'))
+        feature_builder = FeatureBuilder(label_encoders, feature_columns)
         
         print("Model loaded successfully!")
-        print(f"Available airports: {len(airports_df)}")
+        print(f"Available airports: {len(airport_index)}")
         
-        return model, label_encoders, feature_columns, airports_df
+        return model, feature_builder, airport_index
     
     except FileNotFoundError as e:
         print(f"Error: {e}")
         print("Please run create_model.py first to train the model.")
-        return None, None, None, None
+        return None, None, None
 
-def predict_flight_delay(model, label_encoders, feature_columns,
+def predict_flight_delay(model, feature_builder,
                         month, day_of_month, day_of_week,
                         origin_airport_id, dest_airport_id,
                         dep_hour, arr_hour, carrier):
     """Predict delay probability for a specific flight."""
     
-    # Create input data
-    input_data = pd.DataFrame({
-        'Month': [month],
-        'DayofMonth': [day_of_month],
-        'DayOfWeek': [day_of_week],
-        'OriginAirportID': [origin_airport_id],
-        'DestAirportID': [dest_airport_id],
-        'CRSDepTime_Hour': [dep_hour],
-        'CRSArrTime_Hour': [arr_hour],
-        'Carrier': [carrier]
-    })
-    
     # Encode categorical variables
-    if carrier in label_encoders['Carrier'].classes_:
-        input_data['Carrier'] = label_encoders['Carrier'].transform([carrier])
-    else:
+    if carrier not in feature_builder.codes['Carrier']:
         print(f"Warning: Unknown carrier '{carrier}', using default encoding")
-        input_data['Carrier'] = 0
+    
+    # Create input data
+    input_data = feature_builder.build(1, {
+        'Month': month,
+        'DayofMonth': day_of_month,
+        'DayOfWeek': day_of_week,
+        'OriginAirportID': origin_airport_id,
+        'DestAirportID': dest_airport_id,
+        'CRSDepTime_Hour': dep_hour,
+        'CRSArrTime_Hour': arr_hour,
+        'Carrier': feature_builder.encode('Carrier', [carrier], unknown=0)
+    })
     
     # Make prediction
     probability = model.predict_proba(input_data)[0, 1]
@@ -62,12 +64,9 @@ def predict_flight_delay(model, label_encoders, feature_columns,
     
     return probability, prediction
 
-def get_airport_info(airports_df, airport_id):
+def get_airport_info(airport_index, airport_id):
     """Get airport information by ID."""
-    airport = airports_df[airports_df['AirportID'] == airport_id]
-    if not airport.empty:
-        return airport.iloc[0]
-    return None
+    return airport_index.get(airport_id)
 
 def main():
     """Main function for interactive prediction."""
@@ -75,14 +74,15 @@ def main():
     print("=" * 30)
     
     # Load model
-    model, label_encoders, feature_columns, airports_df = load_model()
+    model, feature_builder, airport_index = load_model()
     
     if model is None:
         return
     
     # Show some example airports
     print("\nSample airports:")
-    print(airports_df.head(10)[['AirportID', 'AirportName', 'City', 'State']])
+    sample_airports = list(airport_index.by_id.values())[:10]
+    print(pd.DataFrame(sample_airports)[['AirportID', 'AirportName', 'City', 'State']])
     
     # Example predictions
     examples = [
@@ -108,14 +108,14 @@ def main():
     
     for example in examples:
         prob, pred = predict_flight_delay(
-            model, label_encoders, feature_columns,
+            model, feature_builder,
             example['month'], example['day_of_month'], example['day_of_week'],
             example['origin'], example['dest'], example['dep_hour'], 
             example['arr_hour'], example['carrier']
         )
         
-        origin_info = get_airport_info(airports_df, example['origin'])
-        dest_info = get_airport_info(airports_df, example['dest'])
+        origin_info = get_airport_info(airport_index, example['origin'])
+        dest_info = get_airport_info(airport_index, example['dest'])
         
         print(f"\nFlight: {example['desc']}")
         if origin_info is not None and dest_info is not None:
@@ -142,7 +142,7 @@ def main():
             carrier = input("Carrier code (e.g., AA, UA, DL): ").strip().upper()
             
             prob, pred = predict_flight_delay(
-                model, label_encoders, feature_columns,
+                model, feature_builder,
                 month, day_of_month, day_of_week,
                 origin_id, dest_id, dep_hour, arr_hour, carrier
             )